@@ -0,0 +1,93 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from downtime_engine import area_options, build_cube, build_machine_index, dashboard_summary, detail_summary
+from lkm_charts import bar_figure, heatmap_figure, level3_figure, trend_figure
+from lkm_loader import TARGET_SHEETS, to_canonical
+
+# Ukuran payload JSON grafik (yang dikirim st.plotly_chart ke browser) untuk data berkardinalitas tinggi:
+# ratusan Machine Type / Level 3, banyak Regu, rentang multi-tahun. Mode lama (semua kategori & titik
+# harian) vs mode terbatas (top-N + "Lainnya", downsampling tren). --max-kb: exit 1 jika mode terbatas
+# melebihi batas (bisa dipakai sebagai cek regresi).
+
+
+def make_frame(rows, machine_types, causes, regus, years, seed=0):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2021-01-01')
+    df = pd.DataFrame({
+        'Area': rng.choice(TARGET_SHEETS, rows),
+        'Nama Mesin': [f"M-{i:04d}" for i in rng.integers(0, machine_types * 3, rows)],
+        'Regu': [f"Regu {i}" for i in rng.integers(0, regus, rows)],
+        'Level 3': [f"Penyebab {i} detail kerusakan" for i in rng.zipf(1.3, rows) % causes],
+        'Date_Raw': start + rng.integers(0, 365 * years, rows).astype('timedelta64[D]'),
+        'Total Downtime (Menit)': rng.gamma(2.0, 30.0, rows),
+        'Respon Time': rng.integers(0, 30, rows).astype(float),
+        'Technical Downtime': rng.gamma(2.0, 20.0, rows),
+    })
+    # Machine Type condong ke beberapa tipe besar (seperti data asli)
+    df['Machine Type'] = [f"Type {i}" for i in rng.zipf(1.2, rows) % machine_types]
+    return to_canonical(df)
+
+
+def _payload(fig):
+    t0 = time.perf_counter()
+    size = len(pio.to_json(fig, validate=False))
+    return size, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--machine-types', type=int, default=400)
+    parser.add_argument('--causes', type=int, default=300)
+    parser.add_argument('--regus', type=int, default=40)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--max-kb', type=float, default=None, help="Batas total payload mode terbatas (KB)")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.machine_types, args.causes, args.regus, args.years)
+    cube = build_cube(df)
+    summary = dashboard_summary(cube, area_options(cube))
+    machine = summary['top_machine_type']
+    detail = detail_summary(df, build_machine_index(df), machine)
+
+    charts = {
+        'bar': (lambda: bar_figure(summary['by_machine'], top_n=None), lambda: bar_figure(summary['by_machine'])),
+        'heatmap': (lambda: heatmap_figure(summary['by_machine_regu'], cols=None),
+                    lambda: heatmap_figure(summary['by_machine_regu'])),
+        'trend': (lambda: trend_figure(detail['daily'], downsample=False), lambda: trend_figure(detail['daily'])),
+        'level3': (lambda: level3_figure(detail['level3'], None, top_n=None), lambda: level3_figure(detail['level3'], None)),
+    }
+
+    totals = {'legacy': 0, 'bounded': 0}
+    print(f"rows={len(df)}  machine_types={df['Machine Type'].nunique()}  level3={df['Level 3 Short'].nunique()}  "
+          f"regu={df['Regu'].nunique()}  days={detail['daily'].shape[0]}")
+    for name, builders in charts.items():
+        parts = []
+        for mode, build in zip(['legacy', 'bounded'], builders):
+            t0 = time.perf_counter()
+            fig = build()
+            build_s = time.perf_counter() - t0
+            size, json_s = _payload(fig)
+            totals[mode] += size
+            parts.append(f"{mode}={size / 1024:8.1f} KB (build {build_s * 1000:5.0f} ms, json {json_s * 1000:4.0f} ms, "
+                         f"height {fig.layout.height}px)")
+        print(f"{name:<8} " + "  ".join(parts))
+    print(f"total    legacy={totals['legacy'] / 1024:.1f} KB  bounded={totals['bounded'] / 1024:.1f} KB  "
+          f"ratio={totals['legacy'] / totals['bounded']:.1f}x")
+
+    if args.max_kb is not None and totals['bounded'] / 1024 > args.max_kb:
+        print(f"GAGAL: payload {totals['bounded'] / 1024:.1f} KB > {args.max_kb} KB")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from lkm_loader import (
+    clean_downtime_series, clean_downtime_value, open_workbook, promote_header, read_sheet, detect_header_row,
+    to_datetime_series, to_time_of_day_series,
+)
+from synthetic_lkm import make_workbook
+
+# Pembersih kolom versi vektor vs versi per sel (Series.apply) pada kolom object asli hasil read_excel
+# (campuran angka, datetime.time, '-', kosong, teks angka). --min-speedup: exit 1 jika versi vektor
+# lebih lambat dari batas ini dibanding versi per sel (cek regresi).
+
+
+def format_time(val):
+    # Formatter per sel sebelum jam disimpan sebagai timedelta (pembanding kolom jam)
+    if pd.isna(val): return "-"
+    if isinstance(val, datetime.time): return val.strftime("%H:%M")
+    if isinstance(val, datetime.datetime): return val.strftime("%H:%M")
+    return str(val)
+
+
+def format_date(val):
+    if pd.isna(val): return "-"
+    if isinstance(val, datetime.datetime): return val.strftime("%d-%b-%y")
+    return str(val)
+
+
+CASES = [
+    # (nama, kolom sheet, versi vektor, versi per sel)
+    ('downtime', 'Total\nDowntime', clean_downtime_series, lambda s: s.apply(clean_downtime_value)),
+    ('respon_time', 'Respon Time', clean_downtime_series, lambda s: s.apply(clean_downtime_value)),
+    ('time_of_day', 'Start Downtime', to_time_of_day_series, lambda s: s.apply(format_time)),
+    ('repair_time', 'Start Repair', to_time_of_day_series, lambda s: s.apply(format_time)),
+    ('date', 'Start Date', to_datetime_series, lambda s: s.apply(format_date)),
+]
+
+
+def _best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def raw_columns(path, cells):
+    # Kolom mentah (dtype object) dari semua sheet, diulang sampai `cells` sel per kolom
+    xls = open_workbook(path)
+    frames = []
+    for sheet_name in xls.sheet_names:
+        raw = read_sheet(xls, sheet_name)
+        frames.append(promote_header(raw, detect_header_row(raw)))
+    df = pd.concat(frames, ignore_index=True)
+    repeat = -(-cells // len(df))
+    return {name: pd.Series(np.tile(df[col].to_numpy(dtype=object), repeat)[:cells], dtype=object)
+            for name, col, _, _ in CASES}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000, help="Total baris workbook sintetis (dibagi rata ke 4 sheet)")
+    parser.add_argument('--cells', type=int, default=300000, help="Jumlah sel per kolom yang diukur")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-speedup', type=float, help="Exit 1 jika ada kolom dengan speedup di bawah batas ini")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_workbook(os.path.join(tmp, 'lkm.xlsx'), rows_per_sheet=args.rows // 4)
+        columns = raw_columns(path, args.cells)
+
+    slowest = None
+    print(f"cells={args.cells:,} per kolom, best of {args.repeat}")
+    for name, _, vector, scalar in CASES:
+        s = columns[name]
+        t_vector = _best_of(lambda: vector(s), args.repeat)
+        t_scalar = _best_of(lambda: scalar(s), args.repeat)
+        speedup = t_scalar / t_vector
+        slowest = speedup if slowest is None else min(slowest, speedup)
+        print(f"{name:<12} per sel={t_scalar * 1000:8.1f} ms  vektor={t_vector * 1000:8.1f} ms  speedup={speedup:5.1f}x")
+
+    if args.min_speedup is not None and slowest < args.min_speedup:
+        print(f"GAGAL: speedup terendah {slowest:.2f}x < {args.min_speedup}x")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
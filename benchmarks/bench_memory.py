@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Peak RSS load pandas (pd.read_excel) vs streaming (openpyxl read-only) pada workbook sintetis besar.
+# Tiap mode dijalankan di subprocess sendiri supaya peak RSS tidak saling tercampur.
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_child(path, mode):
+    from lkm_loader import combine_frames, load_sheets
+
+    baseline = _peak_rss_mb()
+    t0 = time.perf_counter()
+    frames, header_rows, _ = load_sheets(path, streaming=(mode == 'streaming'))
+    df = combine_frames(frames, header_rows)
+    print(json.dumps({
+        'mode': mode,
+        'rows': len(df),
+        'seconds': round(time.perf_counter() - t0, 2),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'peak_rss_above_import_mb': round(_peak_rss_mb() - baseline, 1),
+        'frame_mb': round(df.memory_usage(deep=True).sum() / 1024 / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500000, help="Total baris (dibagi rata ke 4 sheet)")
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(*args.child)
+        return
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from synthetic_lkm import make_workbook
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_workbook(os.path.join(tmp, 'lkm.xlsx'), rows_per_sheet=args.rows // 4)
+        for mode in ['pandas', 'streaming']:
+            out = subprocess.run([sys.executable, __file__, '--child', path, mode], check=True, capture_output=True, text=True)
+            print(out.stdout.strip())
+
+
+if __name__ == '__main__':
+    main()
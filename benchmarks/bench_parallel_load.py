@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from lkm_loader import combine_frames, load_sheets
+from synthetic_lkm import make_workbook
+
+# Bandingkan load serial (loop sheet biasa) vs process pool pada workbook 4 sheet.
+
+
+def _timed_load(path, parallel):
+    t0 = time.perf_counter()
+    frames, header_rows, _ = load_sheets(path, parallel=parallel)
+    df = combine_frames(frames, header_rows)
+    return time.perf_counter() - t0, df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000, help="Jumlah baris per sheet")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_workbook(os.path.join(tmp, 'lkm.xlsx'), rows_per_sheet=args.rows)
+        serial, parallel = [], []
+        for _ in range(args.repeat):
+            t_serial, df_serial = _timed_load(path, parallel=False)
+            t_parallel, df_parallel = _timed_load(path, parallel=True)
+            pd.testing.assert_frame_equal(df_serial, df_parallel)
+            serial.append(t_serial)
+            parallel.append(t_parallel)
+
+    print(f"rows/sheet={args.rows}  serial={min(serial):.2f}s  parallel={min(parallel):.2f}s  "
+          f"speedup={min(serial) / min(parallel):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
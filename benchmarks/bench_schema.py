@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from lkm_loader import CATEGORY_COLUMNS, MINUTE_COLUMNS, TIME_COLUMNS, combine_frames, load_sheets
+from synthetic_lkm import make_workbook
+
+# Memori per sesi & kecepatan groupby/pivot: skema kanonik (category/float32/datetime64)
+# vs bentuk lama (label object, float64, kolom tampilan berupa string).
+
+
+def legacy_view(df):
+    legacy = df.copy()
+    for col in CATEGORY_COLUMNS:
+        legacy[col] = legacy[col].astype(object)
+    for col in MINUTE_COLUMNS:
+        legacy[col] = legacy[col].astype('float64')
+    legacy['Tanggal'] = legacy['Date_Raw'].dt.strftime("%d-%b-%y").fillna("-").astype(object)
+    legacy['Stop Date'] = legacy['Stop Date'].dt.strftime("%d-%b-%y").fillna("-").astype(object)
+    for col in TIME_COLUMNS:
+        minutes = (legacy[col].dt.total_seconds() // 60).astype('Int64')
+        hhmm = (minutes // 60).astype(str).str.zfill(2) + ":" + (minutes % 60).astype(str).str.zfill(2)
+        legacy[col] = hhmm.where(minutes.notna(), "-").astype(object)
+    return legacy
+
+
+def _best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def _dashboard_aggregations(df):
+    df_main = df[df['Area'].isin(['Injection', 'Filling', 'Cutting', 'Packing'])]
+    df_main.groupby(['Machine Type'], observed=True)['Total Downtime (Menit)'].sum()
+    df_main.pivot_table(index='Machine Type', columns='Regu', values='Total Downtime (Menit)',
+                        aggfunc='sum', fill_value=0, observed=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000, help="Total baris (dibagi rata ke 4 sheet)")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_workbook(os.path.join(tmp, 'lkm.xlsx'), rows_per_sheet=args.rows // 4)
+        frames, header_rows, _ = load_sheets(path, streaming=True)
+    df = combine_frames(frames, header_rows)
+    legacy = legacy_view(df)
+
+    for name, frame in [('legacy', legacy), ('canonical', df)]:
+        mem_mb = frame.memory_usage(deep=True).sum() / 1024 / 1024
+        agg_s = _best_of(lambda: _dashboard_aggregations(frame), args.repeat)
+        print(f"{name:<10} rows={len(frame)}  memory={mem_mb:.1f} MB  groupby+pivot={agg_s * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+# Load test dashboard: banyak sesi AppTest menjalankan alur landing -> dashboard -> ganti filter area ->
+# detail_page -> pilih Level 3 -> kembali. Sesi dibagi ke beberapa process (paralel, seperti beberapa
+# server); dalam satu process sesi bergantian per rerun dan berbagi dataset & cache seperti di server.
+# Laporan: persentil latensi rerun per langkah, memori (RSS proses & per sesi), throughput rerun/detik.
+# Load lewat job background yang sama dengan tombol "Proses Data" (waktu load = job + rerun yang memasang
+# dataset). Klik grafik Plotly tidak bisa disimulasikan AppTest, jadi pilihan Machine Type / Level 3
+# diisi lewat session_state seperti handler kliknya.
+# --max-p95-ms: exit 1 jika p95 semua rerun melebihi batas (cek regresi).
+
+STEPS = ['landing', 'load', 'dashboard', 'filter_area', 'detail', 'level3', 'back']
+PERCENTILES = [50, 90, 95, 99]
+APP_TIMEOUT = 120
+
+
+def _rss_mb():
+    # RSS saat ini (Linux /proc), fallback ke peak RSS
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _workbook(workdir, rows, seed):
+    from synthetic_lkm import make_workbook
+
+    path = os.path.join(workdir, f"lkm-{rows}-seed{seed}.xlsx")
+    if not os.path.exists(path):
+        print(f"generate {rows} baris -> {path}", file=sys.stderr)
+        make_workbook(path + '.tmp', rows_per_sheet=rows // 4, seed=seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _timed(samples, step, fn):
+    t0 = time.perf_counter()
+    at = fn()
+    samples.append((step, time.perf_counter() - t0))
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].message}")
+    return at
+
+
+def session_flow(path, iterations, samples):
+    # Generator satu sesi: landing sekali, lalu `iterations` kali alur load -> dashboard -> filter area ->
+    # detail -> Level 3 -> kembali. yield setelah tiap rerun supaya sesi lain bisa jalan bergantian.
+    from streamlit.testing.v1 import AppTest
+
+    from downtime_engine import dataset_frame, open_dataset, traced
+    from lkm_jobs import submit
+
+    at = AppTest.from_file(os.path.join(ROOT, 'dashboard.py'), default_timeout=APP_TIMEOUT)
+    _timed(samples, 'landing', at.run)
+    yield at
+
+    for _ in range(iterations):
+        # Sama seperti tombol "Proses Data": job background, lalu rerun sampai finish_load_job memasang dataset
+        def load():
+            job = submit('load', traced, open_dataset, path, label='load', save=False)
+            at.session_state['load_job'] = {'job': job, 'kind': 'load', 'file_path': path, 'save_history': False}
+            job.wait()
+            return at.run()
+        _timed(samples, 'load', load)
+        if at.session_state['current_page'] != 'dashboard':
+            raise RuntimeError("load: tidak pindah ke dashboard")
+        yield at
+        _timed(samples, 'dashboard', at.run)
+        yield at
+
+        # Klik pill Filter Area: sisakan satu area, lalu semua area lagi
+        df = dataset_frame(at.session_state['dataset'])
+        pills = at.button_group(key='widget_filter_area')
+        _timed(samples, 'filter_area', pills.set_value(pills.options[:1]).run)
+        at.button_group(key='widget_filter_area').set_value(pills.options).run()
+        yield at
+
+        # Klik batang Machine Type teratas -> halaman detail, lalu klik Level 3 teratas
+        machine = df['Machine Type'].value_counts().index[0]
+        at.session_state['selected_machine_type'] = machine
+        at.session_state['current_page'] = 'detail_page'
+        _timed(samples, 'detail', at.run)
+        yield at
+        at.session_state['selected_level3'] = df.loc[df['Machine Type'] == machine, 'Level 3 Short'].value_counts().index[0]
+        _timed(samples, 'level3', at.run)
+        yield at
+
+        back = [b for b in at.button if 'Kembali' in b.label][0]
+        _timed(samples, 'back', back.click().run)
+        yield at
+
+
+def _run_child(path, sessions, iterations):
+    # Satu process = satu "server": sesi berjalan bergantian (round-robin) dan berbagi dataset & cache figure.
+    # AppTest memakai runtime Streamlit global per process, jadi sesi dalam satu process tidak bisa paralel.
+    from streamlit.testing.v1 import AppTest # noqa: F401 (import di luar pengukuran memori per sesi)
+
+    from downtime_engine import dataset_stats
+
+    rss_start = _rss_mb()
+    samples, apps = [], {}
+    flows = [session_flow(path, iterations, samples) for _ in range(sessions)]
+    started = time.time()
+    while flows:
+        for flow in list(flows):
+            try:
+                apps[id(flow)] = next(flow) # AppTest tetap hidup -> RSS mencerminkan semua sesi aktif
+            except StopIteration:
+                flows.remove(flow)
+    finished = time.time()
+    print(json.dumps({
+        'samples': samples,
+        'started': started,
+        'finished': finished,
+        'sessions': sessions,
+        'rss_start': round(rss_start, 1),
+        'rss_end': round(_rss_mb(), 1),
+        'shared_mb': round(sum(d['mb'] for d in dataset_stats()), 1),
+    }))
+
+
+def _summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        'count': int(ms.size),
+        **{f"p{p}": round(float(np.percentile(ms, p)), 1) for p in PERCENTILES},
+        'max': round(float(ms.max()), 1),
+    }
+
+
+def _print_row(name, stats, baseline=None):
+    part = "  ".join(f"p{p}={stats[f'p{p}']:8.1f}ms" for p in PERCENTILES)
+    if baseline:
+        part += f"  (p95 {stats['p95'] / max(baseline['p95'], 1e-9):.2f}x)"
+    print(f"{name:<12} n={stats['count']:>4}  {part}  max={stats['max']:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000, help="Total baris workbook sintetis (dibagi rata ke 4 sheet)")
+    parser.add_argument('--sessions', type=int, default=8, help="Jumlah sesi simulasi")
+    parser.add_argument('--processes', type=int, default=2, help="Jumlah process (sesi dibagi rata; process paralel)")
+    parser.add_argument('--iterations', type=int, default=3, help="Berapa kali alur load -> detail diulang per sesi")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help="Folder untuk menyimpan workbook sintetis (default: folder sementara)")
+    parser.add_argument('--out', help="File JSON hasil (default: benchmarks/results/sessions-<waktu>.json)")
+    parser.add_argument('--baseline', help="JSON hasil run sebelumnya untuk dibandingkan")
+    parser.add_argument('--max-p95-ms', type=float, help="Exit 1 jika p95 semua rerun melebihi batas ini")
+    parser.add_argument('--child', nargs=3, metavar=('PATH', 'SESSIONS', 'ITERATIONS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(args.child[0], int(args.child[1]), int(args.child[2]))
+        return
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import pandas as pd
+    import streamlit
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['latency_ms']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _workbook(args.workdir or tmp, args.rows, args.seed)
+        # Cache disk / trace / histori di folder sementara -> run tidak saling memengaruhi
+        env = {**os.environ, 'LKM_CACHE_DIR': os.environ.get('LKM_CACHE_DIR', os.path.join(tmp, 'cache'))}
+        per_process = [args.sessions // args.processes + (i < args.sessions % args.processes) for i in range(args.processes)]
+        children = [
+            subprocess.Popen([sys.executable, __file__, '--child', path, str(n), str(args.iterations)],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+            for n in per_process if n
+        ]
+        results = []
+        for child in children:
+            out, err = child.communicate()
+            if child.returncode:
+                sys.stderr.write(err)
+                sys.exit(child.returncode)
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+    samples = [sample for result in results for sample in result['samples']]
+    wall = max(r['finished'] for r in results) - min(r['started'] for r in results)
+    latency = {step: _summary([s for name, s in samples if name == step]) for step in STEPS}
+    latency['all'] = _summary([s for _, s in samples])
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'streamlit': streamlit.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'rows': args.rows,
+            'sessions': args.sessions,
+            'processes': len(results),
+            'iterations': args.iterations,
+            'seed': args.seed,
+        },
+        'latency_ms': latency,
+        'throughput': {
+            'wall_seconds': round(wall, 2),
+            'reruns_per_second': round(len(samples) / wall, 2),
+            'flows_per_second': round(args.sessions * args.iterations / wall, 2),
+        },
+        'memory_mb': {
+            'rss_start': round(sum(r['rss_start'] for r in results), 1),
+            'rss_end': round(sum(r['rss_end'] for r in results), 1),
+            'per_session': round(sum(r['rss_end'] - r['rss_start'] for r in results) / args.sessions, 1),
+            'shared_datasets': round(sum(r['shared_mb'] for r in results), 1),
+        },
+    }
+
+    print(f"sessions={args.sessions}  processes={report['meta']['processes']}  rows={args.rows}  "
+          f"iterations={args.iterations}")
+    for name, stats in latency.items():
+        _print_row(name, stats, baseline.get(name))
+    print(f"throughput   {report['throughput']['reruns_per_second']:.1f} rerun/s  "
+          f"{report['throughput']['flows_per_second']:.2f} alur/s  (wall {wall:.1f} s)")
+    memory = report['memory_mb']
+    print(f"memori       RSS (semua process) {memory['rss_start']:.0f} -> {memory['rss_end']:.0f} MB  "
+          f"~{memory['per_session']:.1f} MB/sesi  dataset bersama {memory['shared_datasets']:.1f} MB")
+
+    out_path = args.out or os.path.join(ROOT, 'benchmarks', 'results',
+                                        f"sessions-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"hasil disimpan: {out_path}")
+
+    if args.max_p95_ms is not None and latency['all']['p95'] > args.max_p95_ms:
+        print(f"GAGAL: p95 {latency['all']['p95']:.1f} ms > {args.max_p95_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Benchmark end-to-end per ukuran data: parse -> clean -> concat -> agregasi dashboard -> drill-down detail.
+# Tiap ukuran dijalankan di subprocess sendiri (peak RSS tidak tercampur), hasil disimpan sebagai JSON
+# supaya run sekarang bisa dibandingkan dengan run sebelumnya (--baseline).
+
+DEFAULT_SIZES = '1000,10000,100000'
+STAGES = ['parse', 'clean', 'concat', 'dashboard', 'drilldown']
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def _run_child(path, repeat):
+    import pandas as pd
+
+    from downtime_engine import area_options, build_cube, build_machine_index, dashboard_summary, detail_summary
+    from lkm_loader import (
+        TARGET_SHEETS, combine_frames, detect_header_row, match_target, normalize_sheet, open_workbook,
+        promote_header,
+    )
+
+    timings, peak = {}, {}
+
+    def mark(stage, seconds):
+        timings[stage] = round(seconds, 4)
+        peak[stage] = round(_peak_rss_mb(), 1)
+
+    # Parse: baca sheet mentah + deteksi header (sama seperti parse_sheet, tanpa normalisasi)
+    t0 = time.perf_counter()
+    raw_sheets, header_rows = [], {}
+    with open_workbook(path) as xls:
+        for sheet in xls.sheet_names:
+            target = match_target(sheet)
+            if target is None:
+                continue
+            raw = pd.read_excel(xls, sheet_name=sheet, header=None)
+            header_row = detect_header_row(raw)
+            raw_sheets.append((promote_header(raw, header_row), target))
+            header_rows[target] = header_row
+    mark('parse', time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    frames = [normalize_sheet(raw, target) for raw, target in raw_sheets]
+    mark('clean', time.perf_counter() - t0)
+    del raw_sheets
+
+    t0 = time.perf_counter()
+    df = combine_frames(frames, header_rows)
+    mark('concat', time.perf_counter() - t0)
+    del frames
+
+    # Dashboard: cube + metrics/bar/heatmap untuk semua area (kondisi awal halaman dashboard)
+    def dashboard():
+        cube = build_cube(df)
+        return dashboard_summary(cube, area_options(cube))
+
+    seconds, summary = _best_of(dashboard, repeat)
+    mark('dashboard', seconds)
+
+    # Drill-down: index per Machine Type + detail mesin teratas, seluruh tanggal & setengah rentang tanggal
+    machine = summary['top_machine_type']
+
+    def drilldown():
+        index = build_machine_index(df)
+        detail_summary(df, index, machine)
+        dates = index[machine][1]
+        mid = pd.Timestamp(dates[len(dates) // 2]).date()
+        return detail_summary(df, index, machine, pd.Timestamp(dates[0]).date(), mid)
+
+    seconds, _ = _best_of(drilldown, repeat)
+    mark('drilldown', seconds)
+
+    print(json.dumps({
+        'rows': len(df),
+        'sheets': [area for area in TARGET_SHEETS if area in header_rows],
+        'seconds': timings,
+        'total_seconds': round(sum(timings.values()), 4),
+        'peak_rss_mb': peak,
+        'frame_mb': round(df.memory_usage(deep=True).sum() / 1024 / 1024, 1),
+    }))
+
+
+def _workbook(workdir, rows, seed):
+    # Workbook sintetis di-cache per ukuran: generate 1M baris butuh beberapa menit
+    from synthetic_lkm import make_workbook
+
+    path = os.path.join(workdir, f"lkm-{rows}-seed{seed}.xlsx")
+    if not os.path.exists(path):
+        print(f"generate {rows} baris -> {path}", file=sys.stderr)
+        make_workbook(path + '.tmp', rows_per_sheet=rows // 4, seed=seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _print_row(result, baseline=None):
+    parts = [f"rows={result['rows']:>8}"]
+    for stage in STAGES:
+        part = f"{stage}={result['seconds'][stage] * 1000:9.1f}ms"
+        if baseline:
+            part += f" ({result['seconds'][stage] / max(baseline['seconds'][stage], 1e-9):.2f}x)"
+        parts.append(part)
+    parts.append(f"peak={max(result['peak_rss_mb'].values()):.0f}MB")
+    print("  ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Total baris per run (dibagi rata ke 4 sheet), mis. 1000,10000,100000,1000000")
+    parser.add_argument('--repeat', type=int, default=5, help="Best-of-N untuk stage dashboard & drilldown")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help="Folder untuk menyimpan workbook sintetis (default: folder sementara)")
+    parser.add_argument('--out', help="File JSON hasil (default: benchmarks/results/suite-<waktu>.json)")
+    parser.add_argument('--baseline', help="JSON hasil run sebelumnya untuk dibandingkan")
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'REPEAT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(args.child[0], int(args.child[1]))
+        return
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import pandas as pd
+
+    from lkm_loader import PARSER_VERSION
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r['rows']: r for r in json.load(f)['results']}
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        for rows in sizes:
+            path = _workbook(workdir, rows, args.seed)
+            out = subprocess.run([sys.executable, __file__, '--child', path, str(args.repeat)],
+                                 check=True, capture_output=True, text=True)
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(result)
+            _print_row(result, baseline.get(result['rows']))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'parser_version': PARSER_VERSION,
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    out_path = args.out or os.path.join(ROOT, 'benchmarks', 'results',
+                                        f"suite-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"hasil disimpan: {out_path}")
+
+
+if __name__ == '__main__':
+    main()
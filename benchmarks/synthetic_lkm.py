@@ -0,0 +1,57 @@
+import datetime
+import random
+
+import openpyxl
+
+# Generator workbook LKM sintetis untuk benchmark (4 sheet area, header di baris 4/5).
+
+AREAS = ['Injection', 'Filling', 'Cutting', 'Packing']
+HEADER = [
+    'No', 'Start Date', 'Start Downtime', 'Machine Name', 'Machine Type', 'Brand', 'Regu',
+    'Level 2', 'Level 3', 'Tindakan', 'Stop Date', 'Start Repair', 'Stop Repair',
+    'Start Production', 'Respon Time', 'Technical Downtime', 'Total\nDowntime', 'PIC',
+    # Kolom tambahan yang ada di file asli tapi tidak dipakai dashboard
+    'Keterangan', 'Sparepart', 'Qty', 'Diketahui Oleh', 'Catatan Produksi', 'No. WO',
+]
+CAUSES = ['Motor rusak parah', 'Sensor error ringan', 'Belt putus lagi', 'Seal bocor', 'Heater mati total']
+
+
+def _downtime_cell(rnd):
+    # Campuran tipe seperti di file asli: angka, datetime.time, '-', kosong, string angka
+    kind = rnd.random()
+    if kind < 0.5: return rnd.randint(1, 180)
+    if kind < 0.8: return datetime.time(rnd.randint(0, 2), rnd.randint(0, 59), rnd.randint(0, 59))
+    if kind < 0.9: return '-'
+    if kind < 0.95: return None
+    return str(rnd.randint(1, 60))
+
+
+def make_workbook(path, rows_per_sheet=1000, header_rows=(3, 4, 3, 4), seed=0):
+    rnd = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    start = datetime.datetime(2024, 1, 1)
+
+    for area, header_row in zip(AREAS, header_rows):
+        ws = wb.create_sheet(f"LKM {area}")
+        ws.append(['LAPORAN KERUSAKAN MESIN - ' + area.upper()])
+        for _ in range(header_row - 1):
+            ws.append([])
+        ws.append(HEADER)
+
+        for i in range(rows_per_sheet):
+            stop = start + datetime.timedelta(days=rnd.randint(0, 364), minutes=rnd.randint(0, 1439))
+            ws.append([
+                i + 1, stop, stop.time(), f"{area[:3].upper()}-{rnd.randint(1, 40):02d}",
+                f"{area} Type {rnd.randint(1, 15)}", rnd.choice(['Haitian', 'Engel', 'Arburg']),
+                rnd.choice(['A', 'B', 'C']), rnd.choice(['Mekanik', 'Elektrik']), rnd.choice(CAUSES),
+                'Ganti part', stop, datetime.time(rnd.randint(0, 23), rnd.randint(0, 59)),
+                datetime.time(rnd.randint(0, 23), rnd.randint(0, 59)),
+                datetime.time(rnd.randint(0, 23), rnd.randint(0, 59)),
+                rnd.randint(0, 30), _downtime_cell(rnd), _downtime_cell(rnd), rnd.choice(['Budi', 'Sari', 'Andi']),
+                f"Mesin berhenti saat proses ke-{rnd.randint(1, 9999)}", f"SP-{rnd.randint(1000, 9999)}",
+                rnd.randint(1, 5), rnd.choice(['Spv A', 'Spv B']), 'Produksi dilanjutkan setelah pengecekan',
+                f"WO/{stop:%Y%m}/{i:06d}",
+            ])
+
+    wb.save(path)
+    return path
@@ -1,13 +1,25 @@
 import streamlit as st
 import pandas as pd
-import datetime
-import plotly.express as px
-import plotly.graph_objects as go
+import os
 import re
+# Plotly (berat) baru di-import di halaman yang memakai grafik -> landing page tampil lebih cepat
+from lkm_loader import HEADER_SCAN_ROWS
+from downtime_engine import (
+    open_dataset, refresh_dataset, share_dataset, dataset_frame, dataset_view, dataset_stats, traced,
+    add_to_history, load_history, history_range, build_cube, build_machine_index, area_options,
+    dashboard_summary, detail_summary, detail_totals, machine_date_range, build_event_times,
+    update_anomalies, recent_anomalies,
+)
+from lkm_figures import cached_figure, figure_cache_info
+from lkm_jobs import LoadCancelled, submit as submit_job
+from lkm_charts import bar_figure, heatmap_figure, is_others_point, trend_figure, level3_figure
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(page_title="Analisis Downtime Pro", layout="wide", page_icon="🏭")
 
+# Mode debug (?debug=1 atau LKM_DEBUG=1): panel waktu proses per tahap, trace JSON & opsi cProfile
+DEBUG_MODE = os.environ.get("LKM_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
 # CSS Kustom (Diperbarui untuk Layout Rapat/One Screen)
 st.markdown("""
 <style>
@@ -43,8 +55,9 @@ st.markdown("""
 # --- INITIALIZE SESSION STATE ---
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 'landing'
-if 'df_main' not in st.session_state:
-    st.session_state.df_main = None
+# Sesi hanya menyimpan handle ke dataset bersama (satu DataFrame per isi workbook untuk semua sesi)
+if 'dataset' not in st.session_state:
+    st.session_state.dataset = None
 if 'selected_machine_type' not in st.session_state:
     st.session_state.selected_machine_type = None
 # State untuk menyimpan filter agar tidak reset saat pindah halaman
@@ -53,145 +66,147 @@ if 'saved_filter_area' not in st.session_state:
 # State untuk menyimpan pilihan Level 3 di Page 3
 if 'selected_level3' not in st.session_state:
     st.session_state.selected_level3 = None
-
-# --- 1. FUNGSI PEMBERSIH & FORMATTER ---
-def clean_downtime_value(val):
-    if pd.isna(val) or val == '' or val == '-': return 0
-    if isinstance(val, (int, float)): return val
-    if isinstance(val, datetime.time): return (val.hour * 60) + val.minute + (val.second / 60)
-    if isinstance(val, pd.Timedelta): return val.total_seconds() / 60
-    try: return float(str(val).strip())
-    except: return 0
-
-def format_time(val):
-    if pd.isna(val): return "-"
-    if isinstance(val, datetime.time): return val.strftime("%H:%M")
-    if isinstance(val, datetime.datetime): return val.strftime("%H:%M")
-    return str(val)
-
-def format_date(val):
-    if pd.isna(val): return "-"
-    try:
-        if isinstance(val, datetime.datetime): return val.strftime("%d-%b-%y")
-        return str(val)
-    except: return str(val)
-
-def clean_shift(val):
-    if pd.isna(val): return "Unknown"
-    s = str(val).strip().replace('.0', '')
-    if s in ['1', '2', '3']: return f"Shift {s}"
-    return s
-
-# --- 2. LOAD DATA FUNCTION ---
-@st.cache_data(ttl=600) 
-def load_data(file_path):
-    target_sheets = ['Injection', 'Filling', 'Cutting', 'Packing']
-    all_data = []
-    
+if 'parallel_load' not in st.session_state:
+    st.session_state.parallel_load = False
+if 'streaming_load' not in st.session_state:
+    st.session_state.streaming_load = False
+# State fingerprint per sheet untuk Refresh incremental
+if 'ingest_state' not in st.session_state:
+    st.session_state.ingest_state = None
+# State baseline EWMA deteksi anomali (ikut Refresh incremental, reset saat data baru)
+if 'anomaly_state' not in st.session_state:
+    st.session_state.anomaly_state = None
+# Trace load terakhir (waktu per tahap/sheet) untuk panel debug
+if 'load_trace' not in st.session_state:
+    st.session_state.load_trace = None
+# Histori: simpan tiap workbook ke store terpartisi; history_range = periode yang sedang dibuka
+if 'save_history' not in st.session_state:
+    st.session_state.save_history = False
+if 'history_range' not in st.session_state:
+    st.session_state.history_range = None
+# Job load / refresh yang sedang berjalan di background ({'job', 'kind', 'file_path', 'save_history'})
+if 'load_job' not in st.session_state:
+    st.session_state.load_job = None
+
+# --- 1. LOAD DATA FUNCTION ---
+# Parsing, cache disk & normalisasi ada di downtime_engine (tanpa Streamlit). Hasilnya handle dataset
+# bersama (None jika kosong / gagal); tidak lewat st.cache_data supaya tiap sesi tidak dapat salinan sendiri.
+# Load & Refresh jalan sebagai job background (lkm_jobs): halaman tetap responsif, bisa dibatalkan,
+# dan dataset lama tetap tampil sampai job selesai lalu diganti sekaligus di finish_load_job.
+JOB_POLL_SECONDS = 1.0
+
+def start_load_job(kind, file_path, save_history=False, **options):
+    if kind == 'refresh':
+        # Refresh incremental: hanya blok baris baru/berubah yang dibersihkan ulang, sisanya diambil dari df lama
+        job = submit_job(kind, traced, refresh_dataset, file_path, st.session_state.dataset,
+                         st.session_state.ingest_state, label=kind, save=DEBUG_MODE)
+    else:
+        job = submit_job(kind, traced, open_dataset, file_path, **options, label=kind, save=DEBUG_MODE)
+    st.session_state.load_job = {'job': job, 'kind': kind, 'file_path': file_path, 'save_history': save_history}
+
+def finish_load_job():
+    pending = st.session_state.load_job
+    if pending is None or not pending['job'].done():
+        return
+    st.session_state.load_job = None
     try:
-        xls = pd.ExcelFile(file_path)
-        
-        for sheet_name in xls.sheet_names:
-            matched_target = next((t for t in target_sheets if t.lower() in sheet_name.lower()), None)
-            
-            if matched_target:
-                success = False
-                potential_headers = [3, 4] 
-                
-                for header_row in potential_headers:
-                    try:
-                        df = pd.read_excel(xls, sheet_name=sheet_name, header=header_row)
-                        
-                        clean_columns = {}
-                        for col in df.columns:
-                            clean_col = str(col).lower().replace('\n', ' ').replace('\r', '').replace('  ', ' ').strip()
-                            clean_columns[col] = clean_col
-                        
-                        has_machine = any(("machine name" in c or "kode mesin" in c) for c in clean_columns.values())
-                        has_downtime = any(("total" in c and "downtime" in c) for c in clean_columns.values())
-                        
-                        if has_machine and has_downtime:
-                            col_map = {}
-                            for original_col, clean_col in clean_columns.items():
-                                if "machine name" in clean_col or "kode mesin" in clean_col: col_map['Machine'] = original_col
-                                elif "total" in clean_col and "downtime" in clean_col: col_map['Downtime'] = original_col     
-                                elif "start date" in clean_col: col_map['Date'] = original_col
-                                elif "start downtime" in clean_col: col_map['Time'] = original_col
-                                elif "level 2" in clean_col: col_map['Category'] = original_col   
-                                elif "level 3" in clean_col: col_map['Cause'] = original_col      
-                                elif "tindakan" in clean_col: col_map['Action'] = original_col
-                                elif "regu" in clean_col: col_map['Regu'] = original_col # GANTI SHIFT -> REGU
-                                elif "machine type" in clean_col: col_map['Type'] = original_col
-                                elif "brand" in clean_col: col_map['Brand'] = original_col
-                                elif "stop date" in clean_col: col_map['StopDate'] = original_col
-                                elif "start repair" in clean_col: col_map['StartRepair'] = original_col
-                                elif "stop repair" in clean_col: col_map['StopRepair'] = original_col
-                                elif "start production" in clean_col: col_map['StartProduction'] = original_col
-                                elif "respon time" in clean_col: col_map['ResponTime'] = original_col
-                                elif "technical downtime" in clean_col: col_map['TechDowntime'] = original_col
-                                elif "pic" in clean_col: col_map['PIC'] = original_col
-
-                            temp_data = pd.DataFrame()
-                            temp_data['Area'] = [matched_target] * len(df)
-                            
-                            # Simpan Raw Date untuk Filtering
-                            if 'Date' in col_map:
-                                temp_data['Date_Raw'] = pd.to_datetime(df[col_map['Date']], errors='coerce')
-                            else:
-                                temp_data['Date_Raw'] = pd.NaT
-
-                            temp_data['Tanggal'] = df[col_map['Date']] if 'Date' in col_map else "-"
-                            temp_data['Jam'] = df[col_map['Time']] if 'Time' in col_map else "-"
-                            temp_data['Nama Mesin'] = df[col_map['Machine']]
-                            
-                            temp_data['Machine Type'] = df[col_map['Type']] if 'Type' in col_map else "-"
-                            temp_data['Machine Brand'] = df[col_map['Brand']] if 'Brand' in col_map else "-"
-                            
-                            # AMBIL REGU
-                            temp_data['Regu'] = df[col_map['Regu']].astype(str) if 'Regu' in col_map else "-"
-                            
-                            l2 = df[col_map['Category']].fillna('') if 'Category' in col_map else ""
-                            l3 = df[col_map['Cause']].fillna('') if 'Cause' in col_map else ""
-                            temp_data['Penyebab'] = l2.astype(str) + " - " + l3.astype(str)
-                            temp_data['Tindakan'] = df[col_map['Action']] if 'Action' in col_map else "-"
-                            temp_data['Total Downtime (Menit)'] = df[col_map['Downtime']].apply(clean_downtime_value)
-                            
-                            temp_data['Stop Date'] = df[col_map['StopDate']].apply(format_date) if 'StopDate' in col_map else "-"
-                            temp_data['Start Repair'] = df[col_map['StartRepair']].apply(format_time) if 'StartRepair' in col_map else "-"
-                            temp_data['Stop Repair'] = df[col_map['StopRepair']].apply(format_time) if 'StopRepair' in col_map else "-"
-                            temp_data['Start Production'] = df[col_map['StartProduction']].apply(format_time) if 'StartProduction' in col_map else "-"
-                            temp_data['Level 3'] = l3
-                            temp_data['Respon Time'] = df[col_map['ResponTime']].apply(clean_downtime_value) if 'ResponTime' in col_map else 0
-                            temp_data['Technical Downtime'] = df[col_map['TechDowntime']].apply(clean_downtime_value) if 'TechDowntime' in col_map else 0
-                            temp_data['PIC'] = df[col_map['PIC']] if 'PIC' in col_map else "-"
-
-                            temp_data['Tanggal'] = temp_data['Tanggal'].apply(format_date)
-                            temp_data['Jam'] = temp_data['Jam'].apply(format_time)
-
-                            temp_data = temp_data.dropna(subset=['Nama Mesin'])
-                            if not temp_data.empty:
-                                all_data.append(temp_data)
-                            
-                            success = True
-                            break 
-                            
-                    except Exception as e:
-                        continue 
-                
-                if not success:
-                    st.warning(f"⚠️ Sheet '{sheet_name}' gagal dibaca (Cek Header Baris 4 atau 5).")
+        result, st.session_state.load_trace = pending['job'].result()
+    except LoadCancelled:
+        st.toast("Proses data dibatalkan.")
+        return
+    except Exception as e:
+        show_load_error(e)
+        return
+
+    handle, failed_sheets, ingest_state = result
+    warn_failed_sheets(failed_sheets)
+    if handle is None:
+        st.error("Data kosong atau gagal dibaca.")
+        return
+    if pending['save_history']:
+        save_to_history(handle, pending['file_path'])
+
+    # Ganti dataset sekaligus; sampai di sini sesi masih memakai dataset lama
+    st.session_state.dataset = handle
+    st.session_state.ingest_state = ingest_state
+    if pending['kind'] == 'load':
+        # Simpan path file/link untuk keperluan Refresh di Page 2
+        st.session_state.file_path = pending['file_path']
+        st.session_state.history_range = None
+        st.session_state.anomaly_state = None
+        # Reset filter saat data baru masuk
+        st.session_state.saved_filter_area = None
+        st.session_state.current_page = 'dashboard'
 
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_load_job():
+    # Progress per sheet / tahap; hanya fragment ini yang di-rerun selama job berjalan.
+    # Hanya dipanggil selama ada job: fragment yang tidak dirender lagi (job selesai -> rerun penuh) berhenti polling.
+    pending = st.session_state.load_job
+    if pending is None:
+        return
+    job = pending['job']
+    if job.done():
+        st.rerun() # Rerun seluruh halaman -> finish_load_job mengganti dataset
+    progress = job.progress()
+    action = "Refresh data" if pending['kind'] == 'refresh' else "Memproses data"
+    status = "membatalkan..." if progress['status'] == 'cancelling' else (progress['current'] or "menunggu...")
+    c_bar, c_cancel = st.columns([5, 1])
+    with c_bar:
+        st.progress(progress['fraction'] or 0.0,
+                    text=f"⏳ {action}: {status} ({progress['sheets_done']} sheet, {progress['elapsed']:.0f} s)")
+    with c_cancel:
+        st.button("✖️ Batalkan", on_click=job.cancel, disabled=progress['status'] == 'cancelling', key=f"cancel_{job.id}")
+
+# Histori: hanya partisi bulan dalam periode yang dibaca (tidak perlu seluruh histori di memori)
+def load_history_data(start_date, end_date):
+    try:
+        return share_dataset(load_history(start_date, end_date))
     except Exception as e:
-        if "401" in str(e):
-            st.error("🔒 **Error 401: Akses Ditolak.**")
-        else:
-            st.error(f"Gagal membaca sumber data: {e}")
-        return pd.DataFrame()
+        show_load_error(e)
+        return None
 
-    if all_data:
-        return pd.concat(all_data, ignore_index=True)
+def save_to_history(handle, source):
+    try:
+        result = add_to_history(dataset_frame(handle), source)
+    except Exception as e:
+        st.warning(f"⚠️ Gagal menyimpan ke histori: {e}")
+        return
+    if not result['skipped']:
+        st.toast(f"🗄️ {result['rows_added']:,} baris baru disimpan ke histori")
+
+def warn_failed_sheets(failed_sheets):
+    for sheet_name in failed_sheets:
+        st.warning(f"⚠️ Sheet '{sheet_name}' gagal dibaca (Header tidak ditemukan di {HEADER_SCAN_ROWS} baris pertama).")
+
+def show_load_error(e):
+    if "401" in str(e):
+        st.error("🔒 **Error 401: Akses Ditolak.**")
     else:
-        return pd.DataFrame()
+        st.error(f"Gagal membaca sumber data: {e}")
+
+# --- 2. DATASET TURUNAN ---
+def current_df():
+    handle = st.session_state.dataset
+    return dataset_frame(handle) if handle is not None else None
+
+def get_derived(name, builder):
+    # Cube / index dihitung sekali per dataset dan dibagi ke semua sesi yang membuka dataset yang sama
+    return dataset_view(st.session_state.dataset, name, builder)
+
+# --- 3. GRAFIK ---
+# Figure di-cache per (dataset, state filter); rerun karena widget lain tidak membangun ulang grafik.
+# Builder-nya (top-N + "Lainnya", downsampling tren) ada di lkm_charts.
+def figure_key(*state):
+    return (st.session_state.dataset.key, *state)
+
+ANOMALY_RECENT_DAYS = 14
+
+def fmt_metric(value, unit):
+    return f"{value:,.0f} {unit}" if pd.notnull(value) else "-"
+
+# Job background yang sudah selesai -> pasang hasilnya sebelum halaman dirender
+finish_load_job()
 
 # ==========================================
 # PAGE 1: LANDING PAGE (INPUT DATA)
@@ -207,7 +222,7 @@ if st.session_state.current_page == 'landing':
         st.markdown("Silakan pilih sumber data untuk memulai analisis downtime.")
         st.markdown("---")
         
-        source_option = st.radio("Pilih Metode Input:", ["Upload File Excel", "Link Google Sheet"], horizontal=True)
+        source_option = st.radio("Pilih Metode Input:", ["Upload File Excel", "Link Google Sheet", "Histori Tersimpan"], horizontal=True)
         
         final_file_path = None
         
@@ -216,6 +231,37 @@ if st.session_state.current_page == 'landing':
             if uploaded_file:
                 final_file_path = uploaded_file
 
+        elif source_option == "Histori Tersimpan":
+            hist_min, hist_max = history_range()
+            if hist_min is None:
+                st.info("💡 Histori masih kosong. Proses file dengan opsi **'Simpan ke histori'** terlebih dahulu.")
+            else:
+                # Default 3 bulan terakhir, supaya tidak semua histori dibaca ke memori
+                default_start = max(hist_min, (pd.Timestamp(hist_max) - pd.DateOffset(months=3)).date())
+                period = st.date_input(
+                    "📅 Periode Histori:",
+                    value=(default_start, hist_max),
+                    min_value=hist_min,
+                    max_value=hist_max
+                )
+                if isinstance(period, tuple) and len(period) == 2:
+                    if st.button("📚 Buka Histori", type="primary", use_container_width=True):
+                        with st.spinner("Membaca histori..."):
+                            handle, st.session_state.load_trace = traced(
+                                load_history_data, *period, label="history", save=DEBUG_MODE,
+                            )
+                        if handle is not None:
+                            st.session_state.dataset = handle
+                            st.session_state.file_path = None
+                            st.session_state.history_range = tuple(period)
+                            st.session_state.ingest_state = None
+                            st.session_state.anomaly_state = None
+                            st.session_state.saved_filter_area = None
+                            st.session_state.current_page = 'dashboard'
+                            st.rerun()
+                        else:
+                            st.error("Tidak ada data pada periode ini.")
+
         else:
             st.info("💡 Pastikan Google Sheet diatur ke **'Anyone with the link'**.")
             sheet_url = st.text_input("🔗 Paste Link Google Sheet:", placeholder="https://docs.google.com/spreadsheets/d/...")
@@ -229,19 +275,23 @@ if st.session_state.current_page == 'landing':
                     st.error("Link tidak valid.")
 
         if final_file_path:
-            if st.button("🚀 Proses Data", type="primary", use_container_width=True):
-                with st.spinner("Sedang memproses data..."):
-                    df_loaded = load_data(final_file_path)
-                    if not df_loaded.empty:
-                        st.session_state.df_main = df_loaded
-                        # Simpan path file/link untuk keperluan Refresh di Page 2
-                        st.session_state.file_path = final_file_path
-                        # Reset filter saat data baru masuk
-                        st.session_state.saved_filter_area = None
-                        st.session_state.current_page = 'dashboard'
-                        st.rerun()
-                    else:
-                        st.error("Data kosong atau gagal dibaca.")
+            # Opsional: parse tiap sheet area di process terpisah (lebih cepat untuk file besar)
+            parallel_load = st.checkbox("⚡ Proses paralel per sheet", value=st.session_state.parallel_load)
+            # Opsional: baca baris per baris (hemat memori untuk file LKM yang sangat besar)
+            streaming_load = st.checkbox("💾 Mode hemat memori", value=st.session_state.streaming_load)
+            # Opsional: tambahkan isi file ke histori (baris yang sudah ada tidak digandakan)
+            save_history = st.checkbox("🗄️ Simpan ke histori", value=st.session_state.save_history)
+            profile_load = DEBUG_MODE and st.checkbox("🧪 Profil cProfile (debug)", value=False)
+            if st.button("🚀 Proses Data", type="primary", use_container_width=True,
+                         disabled=st.session_state.load_job is not None):
+                st.session_state.parallel_load = parallel_load
+                st.session_state.streaming_load = streaming_load
+                st.session_state.save_history = save_history
+                start_load_job('load', final_file_path, save_history=save_history,
+                               parallel=parallel_load, streaming=streaming_load, profile=profile_load)
+                st.rerun()
+        if st.session_state.load_job is not None:
+            show_load_job()
 
 # ==========================================
 # PAGE 2: DASHBOARD (VISUALISASI 1 LAYAR)
@@ -254,27 +304,56 @@ elif st.session_state.current_page == 'dashboard':
         st.markdown("### 🏭 Dashboard PT Ultra Prima Abadi - Formula")
     with c2:
         # Tombol REFRESH (Fitur Baru)
-        if st.button("🔄 Refresh"):
-            st.cache_data.clear() # Hapus cache lama
+        if st.button("🔄 Refresh", disabled=st.session_state.load_job is not None):
             if st.session_state.file_path:
-                with st.spinner("Mengambil data terbaru..."):
-                    df_new = load_data(st.session_state.file_path)
-                    st.session_state.df_main = df_new
+                # Background: dashboard tetap menampilkan dataset lama sampai refresh selesai
+                start_load_job('refresh', st.session_state.file_path, save_history=st.session_state.save_history)
+            elif st.session_state.history_range:
+                # Mode histori: baca ulang partisi periode yang sama (mungkin ada file baru yang di-ingest)
+                st.session_state.dataset = load_history_data(*st.session_state.history_range)
             st.rerun()
             
     with c3:
         if st.button("⬅️ Ganti File"): # Tombol Back ke Landing Page
-            st.session_state.df_main = None
+            if st.session_state.load_job is not None:
+                st.session_state.load_job['job'].cancel()
+                st.session_state.load_job = None
+            st.session_state.dataset = None # Handle lepas -> dataset dibuang jika tidak ada sesi lain
             st.session_state.saved_filter_area = None
             st.session_state.selected_level3 = None # Reset selected level 3
+            st.session_state.ingest_state = None
+            st.session_state.anomaly_state = None
+            st.session_state.load_trace = None
+            st.session_state.history_range = None
             st.session_state.current_page = 'landing'
-            st.cache_data.clear()
             st.rerun()
 
-    df = st.session_state.df_main
-    
+    if st.session_state.load_job is not None:
+        show_load_job()
+
+    # Mode histori: ganti periode -> query ulang partisi yang dibutuhkan saja
+    if st.session_state.history_range:
+        hist_min, hist_max = history_range()
+        period = st.date_input(
+            "📅 Periode Histori:",
+            value=st.session_state.history_range,
+            min_value=hist_min,
+            max_value=hist_max,
+            key="widget_history_range"
+        )
+        if isinstance(period, tuple) and len(period) == 2 and tuple(period) != st.session_state.history_range:
+            st.session_state.history_range = tuple(period)
+            st.session_state.dataset = load_history_data(*period)
+            st.session_state.anomaly_state = None
+            st.rerun()
+
+    df = current_df()
+
     if df is not None and not df.empty:
-        
+        header_rows = df.attrs.get('header_rows')
+        if header_rows:
+            st.caption("Header terdeteksi: " + ", ".join(f"{sheet} (baris {row + 1})" for sheet, row in header_rows.items()))
+
         # === VISUALISASI RAPAT (TANPA TAB) ===
         
         # --- LAYOUT METRICS & FILTER SEJAJAR ---
@@ -283,13 +362,9 @@ elif st.session_state.current_page == 'dashboard':
         
         # 1. FILTER AREA (Di Kolom Paling Kanan)
         with c_filter:
-            # Custom Order: Injection -> Filling -> Cutting -> Packing
-            custom_order = ['Injection', 'Filling', 'Cutting', 'Packing']
-            available_areas = df['Area'].unique()
-            
-            # Urutkan berdasarkan custom order, sisanya taruh di belakang
-            area_list = [area for area in custom_order if area in available_areas]
-            area_list += [area for area in available_areas if area not in custom_order]
+            # Custom Order: Injection -> Filling -> Cutting -> Packing, sisanya di belakang
+            cube = get_derived('cube', build_cube)
+            area_list = area_options(cube)
             
             if st.session_state.saved_filter_area is None:
                 st.session_state.saved_filter_area = area_list
@@ -303,27 +378,18 @@ elif st.session_state.current_page == 'dashboard':
             )
             st.session_state.saved_filter_area = selected_area
         
-        # Terapkan Filter
-        if selected_area:
-            df_main = df[df['Area'].isin(selected_area)]
-        else:
-            df_main = df[df['Area'].isin([])] # Kosong jika tidak dipilih
+        # Terapkan Filter (ke cube, kosong jika tidak dipilih)
+        summary = dashboard_summary(cube, selected_area)
 
         # 2. METRICS (Di 3 Kolom Pertama)
-        df_agg_metrics = df_main.groupby(['Machine Type'])['Total Downtime (Menit)'].sum().reset_index()
-        df_agg_metrics = df_agg_metrics.sort_values(by='Total Downtime (Menit)', ascending=False)
-        
-        total_dt = df_main['Total Downtime (Menit)'].sum()
-        top_type = df_agg_metrics.iloc[0]['Machine Type'] if not df_agg_metrics.empty else "-"
-        
         with c_metric1:
-            st.metric("Total Downtime", f"{total_dt:,.0f} min")
+            st.metric("Total Downtime", f"{summary['total_downtime']:,.0f} min")
         with c_metric2:
             # Ganti Label: Mesin Kritis -> Downtime Tertinggi
-            st.metric("Downtime Tertinggi", top_type)
+            st.metric("Downtime Tertinggi", summary['top_machine_type'])
         with c_metric3:
             # Ganti Label: Jml Tipe -> Jumlah Mesin
-            st.metric("Jumlah Mesin", len(df_agg_metrics))
+            st.metric("Jumlah Mesin", summary['machine_count'])
         
         st.divider()
 
@@ -334,31 +400,15 @@ elif st.session_state.current_page == 'dashboard':
         with row_viz[0]:
             # Ganti Caption
             st.caption("📊 **Total Downtime per Mesin** (Klik batang untuk melihat detail)")
-            df_agg = df_main.groupby(['Machine Type'])['Total Downtime (Menit)'].sum().reset_index()
-            df_agg = df_agg.sort_values(by='Total Downtime (Menit)', ascending=False)
+            df_agg = summary['by_machine']
             
             if not df_agg.empty:
-                # Tinggi chart dinamis agar batang besar-besar (3 batang per layar)
-                # ~120px per bar agar 3 bar muat di 400px container
-                dynamic_height = max(420, len(df_agg) * 45)
-                
                 with st.container(height=420):
-                    fig_bar = px.bar(
-                        df_agg, 
-                        x='Total Downtime (Menit)', 
-                        y='Machine Type', 
-                        orientation='h', 
-                        text_auto='.0f'
-                    )
-                    fig_bar.update_layout(
-                        yaxis={'categoryorder':'total ascending'}, 
-                        height=dynamic_height, 
-                        margin=dict(l=0, r=0, t=0, b=0),
-                        clickmode='event+select'
-                    )
+                    fig_bar = cached_figure(figure_key('bar', tuple(selected_area)), lambda: bar_figure(df_agg))
                     selection = st.plotly_chart(fig_bar, use_container_width=True, on_select="rerun", selection_mode="points")
                     
-                    if selection and len(selection.selection['points']) > 0:
+                    # Batang gabungan (top-N) = banyak mesin, tidak punya halaman detail
+                    if selection and len(selection.selection['points']) > 0 and not is_others_point(selection.selection['points'][0]):
                         selected_machine = selection.selection['points'][0]['y']
                         st.session_state.selected_machine_type = selected_machine
                         st.session_state.current_page = 'detail_page' 
@@ -367,19 +417,52 @@ elif st.session_state.current_page == 'dashboard':
         # --- KOLOM KANAN: HEATMAP REGU ---
         with row_viz[1]:
             st.caption("🔥 **Jumlah Downtime Mesin berdasarkan Regu**")
-            if 'Regu' in df_main.columns:
-                df_pivot = df_main.pivot_table(index='Machine Type', columns='Regu', values='Total Downtime (Menit)', aggfunc='sum', fill_value=0)
-                df_pivot['Total'] = df_pivot.sum(axis=1)
-                # Restore Top 15 Limit for neatness like before
-                df_pivot = df_pivot.sort_values('Total', ascending=False).drop(columns='Total').head(15) 
-                
-                fig_heat = px.imshow(df_pivot, text_auto=True, aspect="auto", color_continuous_scale="Reds")
-                # Fixed Height matching the container of Bar Chart
-                fig_heat.update_layout(height=420, margin=dict(l=0, r=0, t=0, b=0)) 
+            if 'Regu' in df.columns:
+                fig_heat = cached_figure(
+                    figure_key('heatmap', tuple(selected_area)), lambda: heatmap_figure(summary['by_machine_regu'])
+                )
                 st.plotly_chart(fig_heat, use_container_width=True)
             else:
                 st.info("Kolom 'Regu' tidak ditemukan dalam data.")
 
+        # 4. MESIN DENGAN DOWNTIME TIDAK NORMAL
+        # Baseline EWMA harian / mingguan semua Machine Type; Refresh hanya memproses hari baru
+        st.session_state.anomaly_state = update_anomalies(cube, st.session_state.anomaly_state, st.session_state.dataset.key)
+        flagged = recent_anomalies(
+            st.session_state.anomaly_state, ANOMALY_RECENT_DAYS, summary['by_machine']['Machine Type']
+        )
+        if not flagged.empty:
+            with st.expander(
+                f"⚠️ {flagged['Machine Type'].nunique()} mesin dengan downtime tidak normal "
+                f"({ANOMALY_RECENT_DAYS} hari terakhir) - klik baris untuk melihat detail"
+            ):
+                flagged_show = flagged.assign(Tanggal=flagged['Tanggal'].dt.strftime('%d-%b-%y')).round(1)
+                selection_anomaly = st.dataframe(
+                    flagged_show, use_container_width=True, hide_index=True,
+                    on_select="rerun", selection_mode="single-row", key="table_anomaly"
+                )
+                if selection_anomaly and selection_anomaly.selection['rows']:
+                    st.session_state.selected_machine_type = flagged.loc[selection_anomaly.selection['rows'][0], 'Machine Type']
+                    st.session_state.current_page = 'detail_page'
+                    st.rerun()
+
+        # --- PANEL DEBUG (hanya di mode debug) ---
+        load_trace = st.session_state.load_trace
+        if DEBUG_MODE and load_trace:
+            with st.expander(f"🛠️ Debug: waktu proses ({load_trace['total_seconds']:.2f} s)"):
+                st.dataframe(pd.DataFrame(load_trace['records']), use_container_width=True, hide_index=True)
+                if load_trace.get('path'):
+                    st.caption(f"Trace JSON: {load_trace['path']}")
+                if load_trace['profile']:
+                    st.caption(f"Profil cProfile: {load_trace['profile']['path']}")
+                    st.code(load_trace['profile']['top'])
+                st.caption("Cache figure: " + ", ".join(f"{k}={v}" for k, v in figure_cache_info().items()))
+                st.caption("Dataset bersama di process ini:")
+                st.dataframe(pd.DataFrame(dataset_stats()), use_container_width=True, hide_index=True)
+
+    elif st.session_state.history_range:
+        st.info("Tidak ada data pada periode ini.")
+
 
 # ==========================================
 # PAGE 3: DETAIL PAGE (DRILL DOWN)
@@ -393,18 +476,19 @@ elif st.session_state.current_page == 'detail_page':
         st.rerun()
         
     target_machine = st.session_state.selected_machine_type
-    df = st.session_state.df_main
+    df = current_df()
     
     st.markdown(f"### 🔎 Analisis Detail: **{target_machine}**")
     
     if df is not None:
-        df_detail = df[df['Machine Type'] == target_machine].copy()
+        # Index per Machine Type (urut tanggal) -> filter tanggal cukup slice, tanpa scan seluruh data
+        machine_index = get_derived('machine_index', build_machine_index)
+        start_date, end_date = None, None
         
         c1, c2, c3, c_filter = st.columns([1, 1, 1, 1.5])
         
         with c_filter:
-            min_date = df_detail['Date_Raw'].min()
-            max_date = df_detail['Date_Raw'].max()
+            min_date, max_date = machine_date_range(machine_index, target_machine)
             
             if pd.notnull(min_date) and pd.notnull(max_date):
                 date_range = st.date_input(
@@ -416,22 +500,32 @@ elif st.session_state.current_page == 'detail_page':
                 
                 if isinstance(date_range, tuple) and len(date_range) == 2:
                     start_date, end_date = date_range
-                    df_detail = df_detail[
-                        (df_detail['Date_Raw'].dt.date >= start_date) & 
-                        (df_detail['Date_Raw'].dt.date <= end_date)
-                    ]
             else:
                 st.warning("Data tanggal tidak tersedia.")
 
-        df_detail = df_detail.sort_values(by='Total Downtime (Menit)', ascending=False)
+        event_times = get_derived('event_times', build_event_times)
+        detail = detail_summary(df, machine_index, target_machine, start_date, end_date, event_times)
+        df_detail = detail['rows']
+        totals = detail['totals']
+        reliability = detail['reliability']
+        
+        with c1: st.metric("Total Downtime", f"{totals['Total Downtime (Menit)']:,.0f} min")
+        with c2: st.metric("Total Tech Downtime", f"{totals['Technical Downtime']:,.0f} min")
+        with c3: st.metric("Total Respon Time", f"{totals['Respon Time']:,.0f} min")
         
-        tot_downtime = df_detail['Total Downtime (Menit)'].sum() if 'Total Downtime (Menit)' in df_detail.columns else 0
-        tot_respon = df_detail['Respon Time'].sum() if 'Respon Time' in df_detail.columns else 0
-        tot_tech = df_detail['Technical Downtime'].sum() if 'Technical Downtime' in df_detail.columns else 0
+        # MTTR / MTBF / waktu tunggu dari timestamp asli (Start Date + jam tiap tahap)
+        r1, r2, r3, r4 = st.columns([1, 1, 1, 1.5])
+        with r1: st.metric("MTTR", fmt_metric(reliability['MTTR (Menit)'], "min"), help="Rata-rata lama perbaikan (Start -> Stop Repair)")
+        with r2: st.metric("MTBF", fmt_metric(reliability['MTBF (Jam)'], "jam"), help="Rata-rata jarak antar kerusakan per mesin")
+        with r3: st.metric("Tunggu Perbaikan", fmt_metric(reliability['Tunggu Perbaikan (Menit)'], "min"), help="Rata-rata jarak mulai downtime -> Start Repair")
+        with r4: st.metric("Frekuensi", f"{reliability['Kejadian/Minggu']:,.1f} kejadian/minggu")
         
-        with c1: st.metric("Total Downtime", f"{tot_downtime:,.0f} min")
-        with c2: st.metric("Total Tech Downtime", f"{tot_tech:,.0f} min")
-        with c3: st.metric("Total Respon Time", f"{tot_respon:,.0f} min")
+        with st.expander("⏱️ Reliabilitas per Level 3 / Regu / PIC"):
+            st.caption("MTBF per grup = rata-rata jarak antar kerusakan mesin yang sama di grup yang sama.")
+            tabs = st.tabs(list(detail['reliability_by']))
+            for tab, table in zip(tabs, detail['reliability_by'].values()):
+                with tab:
+                    st.dataframe(table.round(1), use_container_width=True, hide_index=True)
         
         st.divider()
 
@@ -443,22 +537,8 @@ elif st.session_state.current_page == 'detail_page':
             st.caption("📈 **Grafik Downtime Harian**")
             
             if not df_detail.empty:
-                df_trend = df_detail.copy()
-                df_trend['Tanggal_Plot'] = df_trend['Date_Raw'].dt.date
-                
-                df_trend_agg = df_trend.groupby('Tanggal_Plot')['Total Downtime (Menit)'].sum().reset_index()
-                
-                fig_line = px.line(
-                    df_trend_agg, 
-                    x='Tanggal_Plot', 
-                    y='Total Downtime (Menit)',
-                    markers=True,
-                )
-                fig_line.update_layout(
-                    xaxis_title="Tanggal", 
-                    yaxis_title="Total Downtime (Menit)", 
-                    height=350,
-                    margin=dict(l=0, r=0, t=10, b=0)
+                fig_line = cached_figure(
+                    figure_key('trend', target_machine, start_date, end_date), lambda: trend_figure(detail['daily'])
                 )
                 st.plotly_chart(fig_line, use_container_width=True)
             else:
@@ -469,52 +549,12 @@ elif st.session_state.current_page == 'detail_page':
             st.caption("📊 **Total Proporsi Masalah Level 3** (Klik batang untuk melihat detail)")
             
             if not df_detail.empty and 'Level 3' in df_detail.columns:
-                # 1. Hitung frekuensi awal
-                df_level3 = df_detail['Level 3'].value_counts().reset_index()
-                df_level3.columns = ['Level 3', 'Jumlah Kejadian']
-                
-                # 2. Potong nama menjadi 2 kata saja (Truncate)
-                df_level3['Level 3'] = df_level3['Level 3'].astype(str).apply(lambda x: ' '.join(x.split()[:2]))
-                
-                # 3. Group by lagi
-                df_level3 = df_level3.groupby('Level 3')['Jumlah Kejadian'].sum().reset_index()
-                
-                # 4. Sort descending (untuk data processing)
-                df_level3 = df_level3.sort_values(by='Jumlah Kejadian', ascending=False)
-                
-                # 5. Sort ascending agar saat di-plot, bar terbesar ada di ATAS (Plotly default inverted)
-                df_level3 = df_level3.sort_values(by='Jumlah Kejadian', ascending=True) 
-                
-                # Highlight Selected Bar with Strict State Logic
-                colors = []
-                if st.session_state.selected_level3:
-                    for l3 in df_level3['Level 3']:
-                        if l3 == st.session_state.selected_level3:
-                            colors.append('#ff7f0e') # Orange
-                        else:
-                            colors.append('#1f77b4') # Blue
-                else:
-                    colors = ['#1f77b4'] * len(df_level3) # Default Blue
-
-                # Hitung tinggi dinamis berdasarkan jumlah data (agar bisa discroll)
-                # Adjust to 60px/bar so ~5 bars fit in 350px
-                dynamic_height_l3 = max(350, len(df_level3) * 60)
-
+                # Frekuensi per penyebab kanonik, urut ascending agar bar terbesar ada di ATAS
+                selected_level3 = st.session_state.selected_level3
                 with st.container(height=350):
-                    fig_bar_l3 = go.Figure(go.Bar(
-                        x=df_level3['Jumlah Kejadian'],
-                        y=df_level3['Level 3'],
-                        orientation='h',
-                        text=df_level3['Jumlah Kejadian'],
-                        textposition='auto',
-                        marker_color=colors # Apply conditional colors
-                    ))
-                    
-                    fig_bar_l3.update_layout(
-                        height=dynamic_height_l3,
-                        margin=dict(l=0, r=0, t=10, b=0),
-                        yaxis={'categoryorder':'total ascending'},
-                        clickmode='event+select'
+                    fig_bar_l3 = cached_figure(
+                        figure_key('level3', target_machine, start_date, end_date, selected_level3),
+                        lambda: level3_figure(detail['level3'], selected_level3)
                     )
                     
                     # INTERAKTIVITAS: ON SELECT
@@ -529,7 +569,7 @@ elif st.session_state.current_page == 'detail_page':
                     if selection_l3 and len(selection_l3.selection['points']) > 0:
                         new_selection = selection_l3.selection['points'][0]['y']
                         # LOGIKA UPDATE STATE + RERUN (Agar warna langsung berubah saat 1x klik)
-                        if st.session_state.selected_level3 != new_selection:
+                        if not is_others_point(selection_l3.selection['points'][0]) and st.session_state.selected_level3 != new_selection:
                             st.session_state.selected_level3 = new_selection
                             st.rerun()
 
@@ -544,22 +584,19 @@ elif st.session_state.current_page == 'detail_page':
             st.markdown(f"#### 🛠️ Detail Masalah: **{sel_l3}**")
             
             # Filter Data berdasarkan Level 3 yang dipilih
-            df_detail['Level 3 Short'] = df_detail['Level 3'].astype(str).apply(lambda x: ' '.join(x.split()[:2]))
-            df_l3_specific = df_detail[df_detail['Level 3 Short'] == sel_l3].copy()
+            df_l3_specific = df_detail[df_detail['Level 3 Short'] == sel_l3]
             
             # Metrics Khusus Level 3
-            l3_dt = df_l3_specific['Total Downtime (Menit)'].sum() if 'Total Downtime (Menit)' in df_l3_specific.columns else 0
-            l3_tech = df_l3_specific['Technical Downtime'].sum() if 'Technical Downtime' in df_l3_specific.columns else 0
-            l3_resp = df_l3_specific['Respon Time'].sum() if 'Respon Time' in df_l3_specific.columns else 0
+            l3_totals = detail_totals(df_l3_specific)
             
             m1, m2, m3 = st.columns(3)
-            m1.metric(f"Downtime ({sel_l3})", f"{l3_dt:,.0f} min")
-            m2.metric(f"Tech Downtime ({sel_l3})", f"{l3_tech:,.0f} min")
-            m3.metric(f"Respon Time ({sel_l3})", f"{l3_resp:,.0f} min")
+            m1.metric(f"Downtime ({sel_l3})", f"{l3_totals['Total Downtime (Menit)']:,.0f} min")
+            m2.metric(f"Tech Downtime ({sel_l3})", f"{l3_totals['Technical Downtime']:,.0f} min")
+            m3.metric(f"Respon Time ({sel_l3})", f"{l3_totals['Respon Time']:,.0f} min")
             
             # Tabel Khusus Level 3
             cols_l3_show = {
-                'Tanggal': 'Start Date', # Add Start Date
+                'Date_Raw': 'Start Date', # Add Start Date
                 'Stop Date': 'Stop Date', # Add Stop Date
                 'Regu': 'Regu',
                 'Level 3': 'Level 3 Full', # Tampilkan nama asli yang panjang
@@ -577,6 +614,8 @@ elif st.session_state.current_page == 'detail_page':
                 use_container_width=True, 
                 hide_index=True,
                 column_config={
+                    "Start Date": st.column_config.DateColumn(format="DD-MMM-YY"),
+                    "Stop Date": st.column_config.DateColumn(format="DD-MMM-YY"),
                     "Total Downtime": st.column_config.NumberColumn(format="%d min"),
                     "Tech Downtime": st.column_config.NumberColumn(format="%d min"),
                     "Respon Time": st.column_config.NumberColumn(format="%d min"),
@@ -587,7 +626,7 @@ elif st.session_state.current_page == 'detail_page':
         st.caption("📋 **Tabel Downtime Harian**")
 
         cols_to_show = {
-            'Tanggal': 'Start Date', 
+            'Date_Raw': 'Start Date', 
             'Stop Date': 'Stop Date',
             'Regu': 'Regu', 
             'Level 3': 'Level 3 Full', # Update: Rename to 'Level 3 Full' for clarity
@@ -607,6 +646,8 @@ elif st.session_state.current_page == 'detail_page':
             hide_index=True, 
             height=500, 
             column_config={
+                "Start Date": st.column_config.DateColumn(format="DD-MMM-YY"),
+                "Stop Date": st.column_config.DateColumn(format="DD-MMM-YY"),
                 "Total Downtime": st.column_config.NumberColumn(format="%d min"),
                 "Tech Downtime": st.column_config.NumberColumn(format="%d min"),
                 "Respon Time": st.column_config.NumberColumn(format="%d min"),
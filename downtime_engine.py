@@ -0,0 +1,217 @@
+import time
+import uuid
+
+import pandas as pd
+
+from lkm_analytics import (
+    build_cube, build_event_times, build_machine_index, daily_downtime, detail_totals, downtime_by_machine,
+    downtime_by_machine_regu, filter_cube, filter_period, level3_breakdown, level3_counts,
+    machine_date_range, machine_rows, reliability_summary,
+)
+from lkm_anomaly import recent_anomalies, update_anomalies
+from lkm_cache import cache_key, get_cached, put_cached
+from lkm_loader import TARGET_SHEETS, combine_frames, initial_state, load_incremental, load_sheets, read_source_bytes
+from lkm_registry import (
+    acquire, frame as dataset_frame, lookup, state as dataset_state, stats as dataset_stats, view as dataset_view,
+)
+from lkm_store import date_range as store_date_range, ingest, query, read_manifest
+from lkm_trace import collect, log_trace, profiled, save_trace, stage
+
+# Engine analisis downtime tanpa Streamlit: workbook LKM (path, URL, bytes, file upload)
+# -> frame kanonik + agregasi. Dipakai dashboard.py, tapi bisa juga untuk batch job & benchmark.
+# Error tidak ditampilkan di sini, tapi di-raise / dikembalikan ke pemanggil.
+
+# --- 1. INGEST ---
+def load_workbook(source, parallel=False, streaming=False, use_cache=True):
+    # Return (df, header_rows, failed_sheets)
+    df, header_rows, failed_sheets, _ = load_workbook_state(source, parallel, streaming, use_cache)
+    return df, header_rows, failed_sheets
+
+def load_workbook_state(source, parallel=False, streaming=False, use_cache=True):
+    # Seperti load_workbook, plus state untuk refresh_workbook (fingerprint blok dibuat sekalian saat load,
+    # jadi Refresh pertama sudah incremental). Return (df, header_rows, failed_sheets, state)
+    data = read_source_bytes(source)
+    key = cache_key(data)
+    if use_cache:
+        # Cek cache di disk dulu (key = isi file, jadi file yang sama tidak di-parse ulang)
+        with stage('cache_lookup') as record:
+            df_cached, state = get_cached(key)
+            record['hit'] = df_cached is not None
+        if df_cached is not None:
+            df_cached.attrs['source_key'] = key
+            return df_cached, df_cached.attrs.get('header_rows', {}), [], state
+
+    frames, header_rows, failed_sheets = load_sheets(data, parallel=parallel, streaming=streaming)
+    state = {**initial_state(frames), 'source_key': key}
+    df = combine_frames(frames, header_rows)
+    if use_cache and not df.empty:
+        with stage('cache_write', rows=len(df)) as record:
+            record['written'] = put_cached(key, df, state, record)
+    df.attrs['source_key'] = key # Dipakai ingest histori (workbook yang sama tidak di-ingest 2x)
+    return df, header_rows, failed_sheets, state
+
+def refresh_workbook(source, df_prev=None, state=None, use_cache=True):
+    # Refresh incremental: hanya blok baris baru/berubah yang dibersihkan ulang.
+    # Return (df, failed_sheets, state); state disimpan pemanggil untuk refresh berikutnya.
+    data = read_source_bytes(source)
+    key = cache_key(data)
+    # Isi file / export Google Sheet tidak berubah -> tidak perlu parse sama sekali
+    if state and state.get('source_key') == key and df_prev is not None:
+        return df_prev, [], state
+
+    frames, header_rows, failed_sheets, state = load_incremental(data, df_prev, state)
+    state['source_key'] = key
+    df = combine_frames(frames, header_rows)
+    if use_cache and not df.empty:
+        with stage('cache_write', rows=len(df)) as record:
+            record['written'] = put_cached(key, df, state, record)
+    df.attrs['source_key'] = key
+    return df, failed_sheets, state
+
+# --- 1a. DATASET BERSAMA (SATU FRAME PER ISI WORKBOOK PER PROCESS) ---
+def share_dataset(df, state=None):
+    # Daftarkan df ke registry, return handle (None kalau df kosong). Frame tanpa source_key tidak dibagi.
+    if df is None or df.empty:
+        return None
+    return acquire(df.attrs.get('source_key') or uuid.uuid4().hex, df, state)
+
+def open_dataset(source, parallel=False, streaming=False, use_cache=True):
+    # Seperti load_workbook, tapi workbook yang sudah dibuka sesi lain tidak di-load ulang.
+    # Return (handle, failed_sheets, state) seperti refresh_dataset
+    data = read_source_bytes(source)
+    key = cache_key(data)
+    with stage('registry_lookup') as record:
+        df = lookup(key)
+        record['hit'] = df is not None
+    if df is not None:
+        return acquire(key, df), [], dataset_state(key)
+    df, _, failed_sheets, state = load_workbook_state(data, parallel=parallel, streaming=streaming, use_cache=use_cache)
+    return share_dataset(df, state), failed_sheets, state
+
+def refresh_dataset(source, handle=None, state=None, use_cache=True):
+    # refresh_workbook untuk dataset bersama. Return (handle, failed_sheets, state);
+    # isi workbook tidak berubah -> handle lama dipakai lagi
+    df_prev = dataset_frame(handle) if handle is not None else None
+    df, failed_sheets, state = refresh_workbook(source, df_prev, state, use_cache)
+    if df is df_prev:
+        return handle, failed_sheets, state
+    return share_dataset(df, state), failed_sheets, state
+
+# --- 1b. HISTORI (PARQUET TERPARTISI AREA / BULAN) ---
+def source_name(source):
+    if isinstance(source, str):
+        return source
+    return getattr(source, 'name', None)
+
+def add_to_history(df, source=None, store_dir=None):
+    # df hasil load_workbook / refresh_workbook; baris yang sudah ada di histori tidak ditulis ulang
+    with stage('history_ingest', rows=len(df)) as record:
+        result = ingest(df, df.attrs.get('source_key'), source_name(source), store_dir)
+        record.update(rows_added=result['rows_added'], partitions=len(result['partitions']))
+    return result
+
+def load_history(start_date=None, end_date=None, areas=None, store_dir=None):
+    # Hanya partisi bulan (dan area) dalam rentang yang dibaca dari disk
+    with stage('history_query') as record:
+        df = query(start_date, end_date, areas, store_dir)
+        record['rows'] = len(df)
+    # Key dataset bersama: periode yang sama & versi store yang sama -> frame yang sama
+    version = read_manifest(store_dir)['version']
+    df.attrs['source_key'] = f"history:{version}:{start_date}:{end_date}:{sorted(areas) if areas else None}"
+    return df
+
+def history_range(store_dir=None):
+    return store_date_range(store_dir)
+
+# --- 2. AGREGASI ---
+def build_views(df):
+    # Struktur turunan yang cukup dihitung sekali per dataset
+    return {'cube': build_cube(df), 'machine_index': build_machine_index(df)}
+
+def area_options(cube):
+    # Urutan area: Injection -> Filling -> Cutting -> Packing, sisanya di belakang
+    available_areas = cube['Area'].unique()
+    area_list = [area for area in TARGET_SHEETS if area in available_areas]
+    area_list += [area for area in available_areas if area not in TARGET_SHEETS]
+    return area_list
+
+def dashboard_summary(cube, areas):
+    cube_main = filter_cube(cube, areas)
+    by_machine = downtime_by_machine(cube_main)
+    return {
+        'total_downtime': cube_main['Downtime'].sum(),
+        'top_machine_type': by_machine.iloc[0]['Machine Type'] if not by_machine.empty else "-",
+        'machine_count': len(by_machine),
+        'by_machine': by_machine,
+        'by_machine_regu': downtime_by_machine_regu(cube_main),
+    }
+
+RELIABILITY_GROUPS = ['Level 3 Short', 'Regu', 'PIC']
+
+def detail_summary(df, machine_index, machine_type, start_date=None, end_date=None, event_times=None):
+    # event_times = build_event_times(df) (dihitung sekali per dataset) -> ikut hitung MTTR / MTBF
+    df_detail = machine_rows(df, machine_index, machine_type, start_date, end_date, sort_by='Total Downtime (Menit)')
+    detail = {
+        'rows': df_detail,
+        'totals': detail_totals(df_detail),
+        'daily': daily_downtime(df_detail),
+        'level3': level3_counts(df_detail),
+    }
+    if event_times is not None:
+        times = event_times.loc[df_detail.index]
+        detail['reliability'] = reliability_summary(df_detail, times)
+        detail['reliability_by'] = {by: reliability_summary(df_detail, times, by) for by in RELIABILITY_GROUPS}
+    return detail
+
+def report_tables(df, areas=None, start_date=None, end_date=None):
+    # Tabel laporan batch (sama dengan isi dashboard + breakdown Level 3 halaman detail)
+    df = filter_period(df, start_date, end_date)
+    if areas is not None:
+        df = df[df['Area'].isin(areas)]
+    cube = build_cube(df)
+    summary = dashboard_summary(cube, area_options(cube))
+    dates = df['Date_Raw'].dropna()
+    overview = pd.DataFrame([
+        ('Periode', f"{dates.min():%d-%b-%y} s/d {dates.max():%d-%b-%y}" if len(dates) else "-"),
+        ('Jumlah Kejadian', len(df)),
+        ('Total Downtime (Menit)', round(float(summary['total_downtime']), 1)),
+        ('Downtime Tertinggi', summary['top_machine_type']),
+        ('Jumlah Mesin', summary['machine_count']),
+        ('Area', ", ".join(area_options(cube))),
+    ], columns=['Keterangan', 'Nilai'])
+    return {
+        'Ringkasan': overview,
+        'Downtime per Mesin': summary['by_machine'],
+        'Heatmap Regu': summary['by_machine_regu'],
+        'Level 3': level3_breakdown(df),
+        'Reliabilitas': reliability_summary(df, build_event_times(df), 'Machine Type').round(1),
+    }
+
+# --- 3. SATU PANGGILAN (BATCH) ---
+def traced(fn, *args, profile=False, label="load", save=True, **kwargs):
+    # Jalankan fn dengan trace per tahap (+ cProfile opsional), return (hasil, info trace)
+    # Kalau fn raise, trace tetap di-log / disimpan dulu sebelum error diteruskan
+    t0 = time.perf_counter()
+    try:
+        with collect() as records, profiled(profile, label) as prof:
+            result = fn(*args, **kwargs)
+    finally:
+        info = {'records': records, 'total_seconds': round(time.perf_counter() - t0, 6), 'profile': prof}
+        log_trace(records, label)
+        if save:
+            info['path'] = save_trace(records, label, prof, total_seconds=info['total_seconds'])
+    return result, info
+
+def run(source, areas=None, **load_options):
+    df, header_rows, failed_sheets = load_workbook(source, **load_options)
+    if df.empty:
+        return {'df': df, 'header_rows': header_rows, 'failed_sheets': failed_sheets}
+    views = build_views(df)
+    areas = area_options(views['cube']) if areas is None else areas
+    return {
+        'df': df,
+        'header_rows': header_rows,
+        'failed_sheets': failed_sheets,
+        **views,
+        'summary': dashboard_summary(views['cube'], areas),
+    }
@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+
+# Agregasi downtime untuk halaman dashboard & detail (tanpa Streamlit).
+
+# --- 1. CUBE AGREGASI ---
+# Jumlah downtime & jumlah kejadian per Area x Machine Type x Regu x hari.
+# Dibuat sekali per load; metrics, bar chart & heatmap cukup menjumlahkan potongan cube,
+# jadi biaya rerun tidak lagi bergantung pada jumlah baris data mentah.
+CUBE_KEYS = ['Area', 'Machine Type', 'Regu', 'Day']
+
+def build_cube(df):
+    keys = [df['Area'], df['Machine Type'], df['Regu'], df['Date_Raw'].dt.normalize().rename('Day')]
+    minutes = df['Total Downtime (Menit)'].astype('float64')
+    # dropna=False: baris tanpa tanggal / tipe mesin tetap ikut di total downtime
+    cube = minutes.groupby(keys, observed=True, dropna=False).agg(['sum', 'size'])
+    cube.columns = ['Downtime', 'Events']
+    return cube.reset_index()
+
+def filter_cube(cube, areas):
+    return cube[cube['Area'].isin(areas or [])]
+
+# --- 2. QUERY DARI CUBE ---
+def downtime_by_machine(cube):
+    # Sama seperti df.groupby('Machine Type')['Total Downtime (Menit)'].sum(), urut terbesar dulu
+    df_agg = cube.groupby('Machine Type', observed=True)['Downtime'].sum().reset_index()
+    df_agg = df_agg.rename(columns={'Downtime': 'Total Downtime (Menit)'})
+    return df_agg.sort_values(by='Total Downtime (Menit)', ascending=False)
+
+def downtime_by_machine_regu(cube):
+    # Sama seperti df.pivot_table(index='Machine Type', columns='Regu', ...)
+    return cube.pivot_table(index='Machine Type', columns='Regu', values='Downtime', aggfunc='sum', fill_value=0, observed=True)
+
+# --- 3. INDEX DRILL-DOWN (HALAMAN DETAIL) ---
+# Posisi baris per Machine Type, diurutkan berdasarkan Date_Raw (NaT di akhir).
+# Filter tanggal cukup binary search (searchsorted) pada array tanggal yang sudah urut.
+def build_machine_index(df):
+    codes, machine_types = pd.factorize(df['Machine Type'])
+    dates = df['Date_Raw'].to_numpy(dtype='datetime64[ns]')
+    order = np.lexsort((dates, codes))
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+    index = {}
+    for positions in np.split(order, bounds):
+        if len(positions) and codes[positions[0]] >= 0:
+            index[machine_types[codes[positions[0]]]] = (positions, dates[positions])
+    return index
+
+def machine_date_range(index, machine_type):
+    # (min, max) Date_Raw untuk satu Machine Type, NaT jika tidak ada tanggal
+    if machine_type not in index:
+        return pd.NaT, pd.NaT
+    dates = index[machine_type][1]
+    valid = dates[~np.isnat(dates)]
+    if not len(valid):
+        return pd.NaT, pd.NaT
+    return pd.Timestamp(valid[0]), pd.Timestamp(valid[-1])
+
+def machine_positions(index, machine_type, start_date=None, end_date=None):
+    # Posisi baris satu Machine Type, opsional difilter start_date <= tanggal <= end_date (inklusif per hari)
+    if machine_type not in index:
+        return np.empty(0, dtype=np.intp)
+    positions, dates = index[machine_type]
+    lo, hi = 0, len(positions)
+    if start_date is not None:
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date), 'ns'), side='left')
+    if end_date is not None:
+        end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        hi = np.searchsorted(dates, np.datetime64(end, 'ns'), side='left')
+    return positions[lo:hi]
+
+def machine_rows(df, index, machine_type, start_date=None, end_date=None, sort_by=None):
+    # Satu kali take dari frame bersama; sort_by (descending) diurutkan lewat posisi, bukan sort_values
+    # di atas hasil take (yang membuat salinan kedua)
+    positions = machine_positions(index, machine_type, start_date, end_date)
+    if sort_by is not None and len(positions):
+        values = df[sort_by].to_numpy(dtype='float64', na_value=np.nan)[positions]
+        positions = positions[np.argsort(-values, kind='stable')]
+    return df.iloc[positions]
+
+# --- 4. AGREGASI HALAMAN DETAIL ---
+def detail_totals(df_detail):
+    return {
+        col: df_detail[col].sum() if col in df_detail.columns else 0
+        for col in ['Total Downtime (Menit)', 'Technical Downtime', 'Respon Time']
+    }
+
+def daily_downtime(df_detail):
+    # Total downtime per hari untuk grafik tren
+    days = df_detail['Date_Raw'].dt.date.rename('Tanggal_Plot')
+    return df_detail['Total Downtime (Menit)'].groupby(days).sum().reset_index()
+
+def level3_counts(df_detail):
+    # Frekuensi per penyebab kanonik ('Level 3 Short' sudah dihitung sekali saat load, lihat lkm_causes)
+    df_level3 = df_detail['Level 3 Short'].value_counts(sort=False).reset_index()
+    df_level3.columns = ['Level 3', 'Jumlah Kejadian']
+    df_level3 = df_level3[df_level3['Jumlah Kejadian'] > 0] # Kategori yang tidak muncul di mesin ini
+    # Sort descending dulu, lalu ascending agar saat di-plot bar terbesar ada di ATAS
+    df_level3 = df_level3.sort_values(by='Jumlah Kejadian', ascending=False)
+    return df_level3.sort_values(by='Jumlah Kejadian', ascending=True)
+
+def level3_breakdown(df):
+    # Level 3 per Machine Type (laporan batch): jumlah kejadian & total downtime, urut downtime terbesar
+    grouped = df.groupby(['Machine Type', 'Level 3 Short'], observed=True)['Total Downtime (Menit)']
+    df_level3 = grouped.agg(['size', 'sum']).reset_index()
+    df_level3.columns = ['Machine Type', 'Level 3', 'Jumlah Kejadian', 'Total Downtime (Menit)']
+    return df_level3.sort_values(['Machine Type', 'Total Downtime (Menit)'], ascending=[True, False], ignore_index=True)
+
+def filter_period(df, start_date=None, end_date=None):
+    # start_date <= Date_Raw <= end_date (inklusif per hari); tanpa batas -> df apa adanya
+    if start_date is None and end_date is None:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= df['Date_Raw'] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= df['Date_Raw'] < pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    return df[mask]
+
+# --- 5. DATA GRAFIK (TOP-N & DOWNSAMPLING) ---
+# Supaya payload grafik tetap kecil walau Machine Type / Level 3 ratusan dan rentang tanggal bertahun-tahun.
+# "Lainnya" juga penyebab Level 3 yang umum di form LKM, jadi baris gabungan diberi label dengan jumlah
+# isinya ("Lainnya (12 lainnya)") dan ditandai kolom OTHERS_FLAG; klik grafik memakai flag, bukan label.
+OTHERS_LABEL = "Lainnya"
+OTHERS_FLAG = 'Gabungan'
+TREND_DAILY_MAX_DAYS = 92
+TREND_WEEKLY_MAX_DAYS = 731
+
+def others_label(count):
+    return f"{OTHERS_LABEL} ({count} lainnya)"
+
+def top_n_with_others(df, label_col, value_col, n):
+    # n baris dengan value_col terbesar + satu baris gabungan berisi jumlah sisanya (n=None -> semua).
+    # Kolom OTHERS_FLAG: True hanya untuk baris gabungan
+    if n is None or len(df) <= n:
+        return df.assign(**{OTHERS_FLAG: False})
+    ranked = df.sort_values(value_col, ascending=False, kind='stable')
+    others = pd.DataFrame({
+        label_col: [others_label(len(ranked) - n)], value_col: [ranked[value_col].iloc[n:].sum()], OTHERS_FLAG: [True],
+    })
+    top = ranked.iloc[:n][[label_col, value_col]].assign(**{OTHERS_FLAG: False})
+    return pd.concat([top.astype({label_col: object}), others], ignore_index=True)
+
+def top_n_columns(df_pivot, n):
+    # Untuk pivot (heatmap): n kolom dengan total terbesar, sisanya dijumlah ke satu kolom gabungan
+    if n is None or df_pivot.shape[1] <= n:
+        return df_pivot
+    order = df_pivot.sum(axis=0).sort_values(ascending=False, kind='stable').index
+    top = df_pivot[order[:n]]
+    return top.assign(**{others_label(len(order) - n): df_pivot[order[n:]].sum(axis=1)})
+
+def trend_bucket(start, end):
+    # Granularitas tren dipilih dari panjang rentang: harian, mingguan, atau bulanan
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).days
+    if span <= TREND_DAILY_MAX_DAYS:
+        return 'D'
+    if span <= TREND_WEEKLY_MAX_DAYS:
+        return 'W'
+    return 'M'
+
+def downsample_trend(daily):
+    # daily = hasil daily_downtime; return (frame per bucket, 'D' / 'W' / 'M'), Tanggal_Plot = awal bucket
+    if daily.empty:
+        return daily, 'D'
+    dates = pd.to_datetime(daily['Tanggal_Plot'])
+    bucket = trend_bucket(dates.min(), dates.max())
+    if bucket == 'D':
+        return daily, bucket
+    starts = dates.dt.to_period(bucket).dt.start_time.rename('Tanggal_Plot')
+    return daily['Total Downtime (Menit)'].groupby(starts).sum().reset_index(), bucket
+
+# --- 6. RELIABILITAS (MTTR / MTBF / WAKTU TUNGGU) ---
+# Jam (mulai downtime), Start Repair, Stop Repair & Start Production disimpan sebagai jam-dalam-hari
+# (timedelta); di sini digabung dengan tanggal jadi timestamp asli. Jam yang lebih kecil dari tahap
+# sebelumnya dianggap lewat tengah malam (+1 hari). Nilai negatif / lebih dari MAX_STAGE_HOURS = data rusak.
+MAX_STAGE_HOURS = 72
+# Atribut mesin: tiap mesin hanya ada di satu grup, jadi jarak antar kerusakan per mesin sudah di dalam grup.
+# Grup lain (Level 3, Regu, PIC) -> MTBF dihitung dari jarak antar kerusakan mesin yang sama di grup yang sama.
+MACHINE_GROUPS = ('Nama Mesin', 'Machine Type', 'Machine Brand', 'Area')
+
+def _on_or_after(ts, ref):
+    return ts.where(~(ts < ref), ts + pd.Timedelta(days=1))
+
+def _minutes_between(start, end):
+    minutes = (end - start).dt.total_seconds() / 60
+    return minutes.where((minutes >= 0) & (minutes <= MAX_STAGE_HOURS * 60))
+
+def failure_gaps(start, end, codes):
+    # Jarak (jam) dari selesainya kejadian sebelumnya dengan kode grup yang sama ke mulai kejadian ini.
+    # codes = kode grup per baris (-1 = tidak diketahui); kejadian pertama / tumpang tindih -> NaN
+    start_ns = start.to_numpy(dtype='datetime64[ns]')
+    end_ns = end.to_numpy(dtype='datetime64[ns]')
+    order = np.lexsort((start_ns, codes))
+    sorted_codes = codes[order]
+    same_group = np.zeros(len(order), dtype=bool)
+    same_group[1:] = (sorted_codes[1:] == sorted_codes[:-1]) & (sorted_codes[1:] >= 0)
+    gap = np.full(len(order), np.nan)
+    if len(order) > 1:
+        gap[1:] = (start_ns[order][1:] - end_ns[order][:-1]) / np.timedelta64(1, 'h')
+    gap[~same_group | (gap < 0)] = np.nan
+    gap_hours = np.empty_like(gap)
+    gap_hours[order] = gap
+    return gap_hours
+
+def build_event_times(df):
+    # Satu baris per kejadian (index sama dengan df): timestamp tiap tahap + durasi dalam menit,
+    # dan jarak (jam) dari selesainya kerusakan sebelumnya di mesin (Nama Mesin) yang sama.
+    # Selesai = Mulai Produksi, fallback Mulai + Total Downtime.
+    day = df['Date_Raw'].dt.normalize()
+    start = (day + df['Jam']).fillna(df['Date_Raw'])
+    repair_start = _on_or_after(day + df['Start Repair'], start)
+    repair_end = _on_or_after(day + df['Stop Repair'], repair_start.fillna(start))
+    production = _on_or_after(df['Stop Date'].dt.normalize().fillna(day) + df['Start Production'],
+                              repair_end.fillna(start))
+    downtime = pd.to_timedelta(df['Total Downtime (Menit)'].astype('float64'), unit='m')
+    end = production.fillna(start + downtime)
+
+    return pd.DataFrame({
+        'Mulai': start,
+        'Mulai Perbaikan': repair_start,
+        'Selesai Perbaikan': repair_end,
+        'Mulai Produksi': production,
+        'Selesai': end,
+        'Tunggu Perbaikan (Menit)': _minutes_between(start, repair_start),
+        'Lama Perbaikan (Menit)': _minutes_between(repair_start, repair_end),
+        'Jarak Antar Kerusakan (Jam)': failure_gaps(start, end, pd.factorize(df['Nama Mesin'])[0]),
+    }, index=df.index)
+
+def _group_gaps(df, times, by):
+    # Jarak antar kerusakan mesin yang sama di grup `by` yang sama (hanya kejadian di df)
+    codes = df.groupby(['Nama Mesin', by], observed=True, sort=False).ngroup()
+    return failure_gaps(times['Mulai'], times['Selesai'], codes.fillna(-1).to_numpy(dtype=np.int64))
+
+def reliability_summary(df, times, by=None):
+    # MTTR = rata-rata lama perbaikan (Stop - Start Repair; fallback Technical Downtime),
+    # MTBF = rata-rata jarak antar kerusakan per mesin, frekuensi = kejadian per minggu dalam periode df.
+    # by=None -> dict satu baris (untuk metric), by=kolom -> tabel per grup. by di luar MACHINE_GROUPS ->
+    # MTBF grup = jarak antar kerusakan mesin yang sama di grup itu (mis. Level 3 yang sama terulang).
+    tech = df['Technical Downtime'].astype('float64')
+    gaps = times['Jarak Antar Kerusakan (Jam)']
+    if by is not None and by not in MACHINE_GROUPS:
+        gaps = pd.Series(_group_gaps(df, times, by), index=df.index)
+    data = pd.DataFrame({
+        'MTTR (Menit)': times['Lama Perbaikan (Menit)'].fillna(tech.where(tech > 0)),
+        'MTBF (Jam)': gaps,
+        'Tunggu Perbaikan (Menit)': times['Tunggu Perbaikan (Menit)'],
+        'Respon Time (Menit)': df['Respon Time'].astype('float64'),
+    }, index=df.index)
+    dates = df['Date_Raw']
+    weeks = max(((dates.max() - dates.min()).days + 1) / 7, 1) if dates.notna().any() else 1
+
+    if by is None:
+        result = data.mean().to_dict()
+        result['Kejadian'] = len(df)
+        result['Kejadian/Minggu'] = len(df) / weeks
+        return result
+
+    grouped = data.groupby(df[by], observed=True)
+    table = grouped.mean()
+    table.insert(0, 'Kejadian', grouped.size())
+    table.insert(1, 'Kejadian/Minggu', table['Kejadian'] / weeks)
+    return table.sort_values('Kejadian', ascending=False, kind='stable').reset_index()
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+# Deteksi downtime tidak normal per Machine Type (tanpa Streamlit).
+# Baseline = EWMA rata-rata & varians downtime harian dan mingguan. Semua Machine Type dihitung
+# sekaligus (satu vektor per hari / minggu), sumbernya cube agregasi (bukan data mentah).
+# State EWMA disimpan pemanggil, jadi refresh hanya memproses hari / minggu baru.
+# Hari / minggu terakhir di data dianggap belum lengkap: dinilai, tapi baru masuk baseline
+# setelah ada hari / minggu berikutnya. Perubahan isi hari lama tidak dihitung ulang (load baru = state baru).
+
+# --- 1. PARAMETER ---
+# periode: (span EWMA, minimal jumlah periode sebelum boleh di-flag, std minimum dalam menit)
+# std minimum mencegah mesin yang hampir selalu 0 ter-flag hanya karena satu kejadian kecil
+PERIODS = {
+    'Harian': (14, 14, 60.0),
+    'Mingguan': (8, 4, 180.0),
+}
+Z_THRESHOLD = 3.0
+ANOMALY_COLUMNS = ['Machine Type', 'Periode', 'Tanggal', 'Downtime (Menit)', 'Baseline (Menit)', 'Z']
+
+
+def _bucket(index, period):
+    # Index tanggal harian -> awal periode (minggu mulai Senin)
+    return index if period == 'Harian' else index.to_period('W').start_time
+
+
+def daily_totals(cube, start=None):
+    # Downtime per hari x Machine Type (hari tanpa kejadian = 0) dari cube build_cube
+    if start is not None:
+        cube = cube[cube['Day'] >= start]
+    daily = cube.groupby(['Day', 'Machine Type'], observed=True)['Downtime'].sum().unstack(fill_value=0)
+    if daily.empty:
+        return daily
+    days = pd.date_range(start if start is not None else daily.index.min(), daily.index.max(), freq='D')
+    return daily.reindex(days, fill_value=0).astype('float64')
+
+
+# --- 2. EWMA PER PERIODE ---
+def _empty_state():
+    return {'through': None, 'columns': pd.Index([]), 'mean': np.zeros(0), 'var': np.zeros(0), 'count': np.zeros(0)}
+
+
+def _align(period_state, columns):
+    # Machine Type lama yang tidak muncul lagi tetap dibawa. Machine Type baru dianggap 0 di semua periode
+    # sebelumnya (mean = var = 0, count = jumlah periode yang sudah diproses), sama seperti hitung penuh.
+    seen = period_state['count'].max() if len(period_state['count']) else 0
+    columns = period_state['columns'].union(columns)
+    prev = pd.DataFrame(
+        {k: period_state[k] for k in ('mean', 'var', 'count')}, index=period_state['columns']
+    ).reindex(columns).fillna({'mean': 0.0, 'var': 0.0, 'count': seen})
+    return columns, prev['mean'].to_numpy(float), prev['var'].to_numpy(float), prev['count'].to_numpy(float)
+
+
+def _scan(values, mean, var, count, alpha, min_periods, min_std):
+    # Baris = periode (urut waktu), kolom = Machine Type. Z tiap periode dihitung terhadap baseline
+    # sebelum periode itu masuk EWMA. Return (z, baseline, mean, var, count setelah baris terakhir)
+    z = np.full(values.shape, np.nan)
+    base = np.full(values.shape, np.nan)
+    for i, x in enumerate(values):
+        ready = count >= min_periods
+        base[i] = np.where(count > 0, mean, np.nan)
+        z[i] = np.where(ready, (x - mean) / np.maximum(np.sqrt(var), min_std), np.nan)
+        diff = x - mean
+        incr = alpha * diff
+        first = count == 0
+        mean = np.where(first, x, mean + incr)
+        var = np.where(first, 0.0, (1 - alpha) * (var + diff * incr))
+        count = count + 1
+    return z, base, mean, var, count
+
+
+def _update_period(daily, period_state, period):
+    span, min_periods, min_std = PERIODS[period]
+    totals = daily.groupby(_bucket(daily.index, period)).sum()
+    if period_state['through'] is not None:
+        totals = totals[totals.index > period_state['through']]
+    columns, mean, var, count = _align(period_state, totals.columns)
+    totals = totals.reindex(columns=columns, fill_value=0)
+    if totals.empty:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS), period_state
+    values = totals.to_numpy(float)
+    alpha = 2 / (span + 1)
+
+    # Semua periode kecuali yang terakhir masuk baseline; periode terakhir hanya dinilai
+    z, base, mean, var, count = _scan(values[:-1], mean, var, count, alpha, min_periods, min_std)
+    z_last, base_last, *_ = _scan(values[-1:], mean, var, count, alpha, min_periods, min_std)
+    z, base = np.vstack([z, z_last]), np.vstack([base, base_last])
+
+    flagged = np.nonzero(z >= Z_THRESHOLD)
+    anomalies = pd.DataFrame({
+        'Machine Type': columns[flagged[1]],
+        'Periode': period,
+        'Tanggal': totals.index[flagged[0]],
+        'Downtime (Menit)': values[flagged],
+        'Baseline (Menit)': base[flagged],
+        'Z': z[flagged],
+    }, columns=ANOMALY_COLUMNS)
+    through = totals.index[-2] if len(totals) > 1 else period_state['through']
+    return anomalies, {'through': through, 'columns': columns, 'mean': mean, 'var': var, 'count': count}
+
+
+# --- 3. UPDATE INCREMENTAL ---
+def update_anomalies(cube, state=None, key=None):
+    # cube = build_cube(df). state = hasil panggilan sebelumnya (None = hitung dari awal).
+    # key = identitas dataset; key sama dengan state -> tidak ada yang dihitung ulang.
+    if state is not None and key is not None and state.get('key') == key:
+        return state
+    days = cube['Day'].dropna()
+    last_day = state['last_day'] if state is not None else None
+    if last_day is None:
+        state = None # State dari data kosong -> belum ada baseline, hitung dari awal
+    elif days.empty or days.max() < last_day:
+        state = None # Data lebih pendek dari sebelumnya -> bukan tambahan, hitung ulang
+    if state is None:
+        state = {'periods': {p: _empty_state() for p in PERIODS}, 'anomalies': pd.DataFrame(columns=ANOMALY_COLUMNS),
+                 'last_day': None}
+
+    # Cukup ambil hari sejak periode pertama yang belum masuk baseline (harian / mingguan)
+    starts = []
+    for period, period_state in state['periods'].items():
+        through = period_state['through']
+        if through is None:
+            starts = []
+            break
+        starts.append(through + (pd.Timedelta(days=1) if period == 'Harian' else pd.Timedelta(days=7)))
+    daily = daily_totals(cube, min(starts) if starts else None)
+
+    if daily.empty:
+        return {**state, 'key': key}
+    frames, periods = [], {}
+    kept = state['anomalies']
+    for period, period_state in state['periods'].items():
+        anomalies, periods[period] = _update_period(daily, period_state, period)
+        if period_state['through'] is not None:
+            kept = kept[(kept['Periode'] != period) | (kept['Tanggal'] <= period_state['through'])]
+        else:
+            kept = kept[kept['Periode'] != period]
+        frames.append(anomalies)
+    anomalies = pd.concat([kept, *frames], ignore_index=True) if len(kept) else pd.concat(frames, ignore_index=True)
+    return {'periods': periods, 'anomalies': anomalies, 'last_day': daily.index.max(), 'key': key}
+
+
+def recent_anomalies(state, days=14, machine_types=None):
+    # Anomali dalam `days` hari terakhir data (minggu dihitung dari tanggal awal minggu), Z terbesar dulu
+    anomalies = state['anomalies'] if state else pd.DataFrame(columns=ANOMALY_COLUMNS)
+    if len(anomalies) and state['last_day'] is not None:
+        since = state['last_day'] - pd.Timedelta(days=days - 1)
+        anomalies = anomalies[(anomalies['Tanggal'] >= since) |
+                              ((anomalies['Periode'] == 'Mingguan') & (anomalies['Tanggal'] >= since - pd.Timedelta(days=6)))]
+    if machine_types is not None:
+        anomalies = anomalies[anomalies['Machine Type'].isin(machine_types)]
+    return anomalies.sort_values('Z', ascending=False).reset_index(drop=True)
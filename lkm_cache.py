@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+import pandas as pd
+
+# Cache hasil parsing di disk (Parquet), key = hash isi workbook + versi parser.
+# Bertahan walau server restart / tombol Refresh menghapus st.cache_data.
+# CACHE_DIR juga folder induk data lokal lain (download remote, trace, histori).
+# State refresh incremental (fingerprint blok per sheet) ikut disimpan di attrs Parquet (JSON).
+
+CACHE_DIR = os.environ.get("LKM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dashboard-formula"))
+CACHE_MAX_BYTES = int(os.environ.get("LKM_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+logger = logging.getLogger("lkm.cache")
+
+
+def cache_key(data):
+    from lkm_loader import PARSER_VERSION # lkm_loader -> lkm_trace -> lkm_cache: hindari import melingkar
+    return hashlib.sha256(PARSER_VERSION.encode() + b"\0" + data).hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
+
+
+def get_cached(key):
+    # Return (df, state) atau (None, None)
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # File cache rusak (mis. proses mati saat menulis) -> buang saja
+        _remove(path)
+        return None, None
+    # Sentuh mtime supaya dianggap baru dipakai (LRU)
+    os.utime(path)
+    return df, df.attrs.pop('ingest_state', None)
+
+
+def put_cached(key, df, state=None, record=None):
+    # Return True kalau tersimpan. Gagal tulis tidak menggagalkan load, tapi dicatat di log + record trace.
+    if state is not None:
+        df = df.copy(deep=False)
+        df.attrs['ingest_state'] = state
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, _cache_path(key))
+    except (ValueError, TypeError, OSError) as exc:
+        # Mis. kolom object campuran yang lolos skema kanonik, disk penuh -> lewati cache
+        _remove(tmp_path)
+        logger.warning("cache write skipped for %s: %s: %s", key[:12], type(exc).__name__, exc)
+        if record is not None:
+            record['error'] = f"{type(exc).__name__}: {exc}"
+        return False
+    evict_cache()
+    return True
+
+
+def evict_cache(max_bytes=None):
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".parquet"):
+            stat = os.stat(os.path.join(CACHE_DIR, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    # Hapus yang paling lama tidak dipakai sampai total ukuran di bawah batas
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(os.path.join(CACHE_DIR, name))
+        total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
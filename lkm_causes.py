@@ -0,0 +1,133 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Normalisasi teks penyebab Level 3, dijalankan sekali saat load dan per nilai unik (bukan per baris):
+# 1. case-fold, hapus aksen & tanda baca, rapikan spasi -> "Ganti  Bearing." sama dengan "ganti bearing"
+# 2. ejaan yang mirip (typo) digabung jadi satu cluster. Kandidat pasangan dicari dengan sorted
+#    neighbourhood: urutkan teks (dan teks terbalik), bandingkan hanya WINDOW tetangga terdekat.
+#    Pasangan dibandingkan per kata: jumlah kata sama, hanya satu kata yang beda, kata itu minimal
+#    MIN_TYPO_LENGTH huruf dan bedanya satu edit ("eror" ~ "error"). Dua kata yang sama-sama ada di
+#    VOCABULARY tidak digabung ("valve" / "value"), kata berangka juga tidak ("Nozzle 1" != "Nozzle 2").
+# 3. tiap cluster dapat label kanonik = ejaan yang paling sering muncul. ID integer penyebab
+#    = kode kategori kolom hasil, jadi groupby / filter di grafik & drill-down cukup pakai kode.
+WINDOW = 5
+MIN_TYPO_LENGTH = 5
+# Kata baku (Indonesia / Inggris) yang sering ada di form LKM; dua kata baku yang beda satu huruf
+# dianggap dua hal berbeda, bukan typo
+VOCABULARY = frozenset("""
+    alarm angin aus bagian baru baut bearing belt bengkok berisik blade bocor bolt buka buntu bunyi
+    cable chain check cetakan conveyor coupling cutter cylinder error fault filter fitting gasket
+    gear gearbox getar habis heater hidrolik hydraulic inverter jalan jammed kabel kendor klem kopling
+    kontaktor korsleting kotor kurang leak lepas level limit listrik longgar macet mati mesin model
+    mold motor mould naik nozzle oli packing panas panel patah pecah pegas pipa pisau plat pneumatic
+    pneumatik poros pompa power pressure program proximity pulley putus rantai relay retak roller
+    rusak saklar screw seal selang sekrup sensor servo setting shaft silinder sobek solenoid spring
+    start stop suhu switch tangki tank tekanan terbakar tersumbat timer tombol trip turun vacuum
+    vakum value valve
+""".split())
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_DIGITS = re.compile(r"\d")
+
+
+def normalize_causes(labels):
+    # Index / Series teks -> kunci pembanding (huruf kecil, tanpa aksen & tanda baca, spasi tunggal)
+    keys = pd.Series(labels, dtype=object).astype(str)
+    keys = keys.str.normalize('NFKD').str.replace(_COMBINING, '', regex=True).str.casefold()
+    return keys.str.replace(_PUNCTUATION, ' ', regex=True).str.split().str.join(' ')
+
+
+def _one_edit(a, b):
+    # Jarak edit (sisip / hapus / ganti / tukar 2 huruf bersebelahan) paling banyak 1
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) <= 1 or (len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]]
+                                  and a[diff[1]] == b[diff[0]])
+    short, long = (a, b) if len(a) < len(b) else (b, a)
+    i = next((i for i in range(len(short)) if short[i] != long[i]), len(short))
+    return short[i:] == long[i + 1:]
+
+
+def _similar(a, b):
+    words_a, words_b = a.split(), b.split()
+    if len(words_a) != len(words_b):
+        return False
+    diff = [(x, y) for x, y in zip(words_a, words_b) if x != y]
+    if len(diff) != 1:
+        return False
+    x, y = diff[0]
+    if max(len(x), len(y)) < MIN_TYPO_LENGTH or _DIGITS.search(x) or _DIGITS.search(y):
+        return False
+    if x in VOCABULARY and y in VOCABULARY:
+        return False
+    return _one_edit(x, y)
+
+
+def cluster_causes(keys):
+    # keys = list teks ternormalisasi (unik). Return array id cluster (= index anggota terkecil)
+    n = len(keys)
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    by_text = sorted(range(n), key=keys.__getitem__)
+    by_reversed = sorted(range(n), key=lambda i: keys[i][::-1])
+    for order in (by_text, by_reversed):
+        for pos, i in enumerate(order):
+            if not keys[i]:
+                continue
+            for j in order[pos + 1:pos + 1 + WINDOW]:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j and keys[j] and _similar(keys[i], keys[j]):
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+    return np.array([find(i) for i in range(n)], dtype=np.int64)
+
+
+def canonical_causes(cat):
+    # Series kategori Level 3 -> Series kategori label kanonik (index sama, NaN tetap NaN)
+    labels = pd.Index(cat.cat.categories.astype(str))
+    codes = cat.cat.codes.to_numpy()
+    valid = codes[codes >= 0]
+    counts = np.bincount(valid, minlength=len(labels))
+    # Urutan kemunculan pertama tiap label di data (kategori sendiri urut abjad)
+    first_seen = np.full(len(labels), len(codes))
+    seen, positions = np.unique(codes, return_index=True)
+    first_seen[seen[seen >= 0]] = positions[seen >= 0]
+    spelling = labels.str.split().str.join(' ')
+
+    keys = normalize_causes(labels)
+    key_codes, unique_keys = pd.factorize(keys)
+    cluster = cluster_causes(list(unique_keys))[key_codes] if len(labels) else np.zeros(0, dtype=np.int64)
+
+    # Label kanonik per cluster: kunci ternormalisasi yang paling sering muncul, lalu ejaan (spasi
+    # dirapikan) terbanyak dari kunci itu. Seri -> kata baku terbanyak (VOCABULARY), tanpa tanda baca,
+    # bukan kapital semua, lebih panjang ("error" > "eror"), lalu yang muncul lebih dulu di data
+    votes = pd.DataFrame({
+        'cluster': cluster, 'key': key_codes, 'label': spelling, 'count': counts, 'first_seen': first_seen,
+        'words': [sum(word in VOCABULARY for word in key.split()) for key in keys],
+    })
+    votes = votes.groupby(['cluster', 'key', 'label'], sort=False).agg(
+        count=('count', 'sum'), first_seen=('first_seen', 'min'), words=('words', 'first'),
+    ).reset_index()
+    votes['key_count'] = votes.groupby(['cluster', 'key'])['count'].transform('sum')
+    votes['punctuation'] = votes['label'].str.contains(_PUNCTUATION)
+    votes['upper'] = votes['label'].str.isupper()
+    votes['length'] = votes['label'].str.len()
+    best = votes.sort_values(
+        ['key_count', 'count', 'words', 'punctuation', 'upper', 'length', 'first_seen'],
+        ascending=[False, False, False, True, True, False, True], kind='stable',
+    ).drop_duplicates('cluster')
+    canonical = pd.Series(best['label'].to_numpy(), index=best['cluster'].to_numpy())[cluster]
+
+    categories = pd.Index(canonical.unique()).sort_values()
+    mapping = categories.get_indexer(canonical.to_numpy())
+    new_codes = np.where(codes >= 0, mapping[codes] if len(mapping) else codes, -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories), index=cat.index, name=cat.name)
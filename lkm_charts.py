@@ -0,0 +1,124 @@
+from lkm_analytics import OTHERS_FLAG, downsample_trend, top_n_columns, top_n_with_others
+
+# Builder figure Plotly dashboard (tanpa Streamlit, supaya ukuran payload bisa diukur di benchmark).
+# Plotly (berat) baru di-import saat grafik pertama kali dibuat -> landing page tampil lebih cepat.
+# Batas top-N membuat tinggi chart & ukuran JSON yang dikirim ke browser tidak tumbuh tanpa batas;
+# top_n=None / downsample=False = perilaku lama (semua kategori, semua titik); tren tanpa downsampling
+# yang panjang digambar dengan WebGL.
+
+BAR_TOP_N = 30
+LEVEL3_TOP_N = 25
+HEATMAP_ROWS = 15
+HEATMAP_COLS = 10
+WEBGL_MIN_POINTS = 1000
+TREND_AXIS_TITLES = {'D': "Tanggal", 'W': "Minggu", 'M': "Bulan"}
+
+
+def _category_array(df, label_col):
+    # Bar horizontal: kategori pertama di bawah -> batang gabungan selalu paling bawah, sisanya urut nilai
+    others = df[OTHERS_FLAG].to_numpy(bool)
+    return list(df[label_col][others]) + list(df[label_col][~others])
+
+
+def is_others_point(point):
+    # Titik hasil klik st.plotly_chart: customdata[0] = OTHERS_FLAG (batang gabungan tidak bisa dipilih)
+    return bool((point.get('customdata') or [False])[0])
+
+
+def bar_figure(df_agg, top_n=BAR_TOP_N):
+    import plotly.express as px
+    df_agg = top_n_with_others(df_agg, 'Machine Type', 'Total Downtime (Menit)', top_n)
+    # Tinggi chart dinamis agar batang besar-besar (3 batang per layar)
+    # ~120px per bar agar 3 bar muat di 400px container
+    dynamic_height = max(420, len(df_agg) * 45)
+    fig_bar = px.bar(
+        df_agg, 
+        x='Total Downtime (Menit)', 
+        y='Machine Type', 
+        orientation='h', 
+        text_auto='.0f',
+        custom_data=[OTHERS_FLAG],
+    )
+    ascending = df_agg.sort_values('Total Downtime (Menit)', kind='stable')
+    fig_bar.update_layout(
+        yaxis={'categoryorder': 'array', 'categoryarray': _category_array(ascending, 'Machine Type')}, 
+        height=dynamic_height, 
+        margin=dict(l=0, r=0, t=0, b=0),
+        clickmode='event+select'
+    )
+    return fig_bar
+
+
+def heatmap_figure(df_pivot, rows=HEATMAP_ROWS, cols=HEATMAP_COLS):
+    import plotly.express as px
+    # Top 15 mesin (baris) & Regu terbanyak (kolom, sisanya jadi satu kolom gabungan)
+    totals = df_pivot.sum(axis=1).sort_values(ascending=False, kind='stable')
+    df_pivot = top_n_columns(df_pivot.loc[totals.index[:rows]], cols)
+    
+    fig_heat = px.imshow(df_pivot, text_auto=True, aspect="auto", color_continuous_scale="Reds")
+    # Fixed Height matching the container of Bar Chart
+    fig_heat.update_layout(height=420, margin=dict(l=0, r=0, t=0, b=0)) 
+    return fig_heat
+
+
+def trend_figure(df_trend_agg, downsample=True):
+    import plotly.express as px
+    # Rentang panjang -> dijumlah per minggu / bulan di server, bukan ribuan titik harian ke browser
+    # Hasil downsampling paling banyak ~105 titik; WebGL hanya untuk semua titik harian (downsample=False)
+    bucket, render_mode = 'D', 'auto'
+    if downsample:
+        df_trend_agg, bucket = downsample_trend(df_trend_agg)
+    elif len(df_trend_agg) >= WEBGL_MIN_POINTS:
+        render_mode = 'webgl'
+    fig_line = px.line(
+        df_trend_agg, 
+        x='Tanggal_Plot', 
+        y='Total Downtime (Menit)',
+        markers=True,
+        render_mode=render_mode,
+    )
+    fig_line.update_layout(
+        xaxis_title=TREND_AXIS_TITLES[bucket], 
+        yaxis_title="Total Downtime (Menit)", 
+        height=350,
+        margin=dict(l=0, r=0, t=10, b=0)
+    )
+    return fig_line
+
+
+def level3_figure(df_level3, selected_level3, top_n=LEVEL3_TOP_N):
+    import plotly.graph_objects as go
+    df_level3 = top_n_with_others(df_level3, 'Level 3', 'Jumlah Kejadian', top_n)
+    df_level3 = df_level3.sort_values(by='Jumlah Kejadian', ascending=True, kind='stable')
+    # Highlight Selected Bar with Strict State Logic
+    colors = []
+    if selected_level3:
+        for l3 in df_level3['Level 3']:
+            if l3 == selected_level3:
+                colors.append('#ff7f0e') # Orange
+            else:
+                colors.append('#1f77b4') # Blue
+    else:
+        colors = ['#1f77b4'] * len(df_level3) # Default Blue
+
+    # Hitung tinggi dinamis berdasarkan jumlah data (agar bisa discroll)
+    # Adjust to 60px/bar so ~5 bars fit in 350px
+    dynamic_height_l3 = max(350, len(df_level3) * 60)
+
+    fig_bar_l3 = go.Figure(go.Bar(
+        x=df_level3['Jumlah Kejadian'],
+        y=df_level3['Level 3'],
+        orientation='h',
+        text=df_level3['Jumlah Kejadian'],
+        textposition='auto',
+        marker_color=colors, # Apply conditional colors
+        customdata=df_level3[[OTHERS_FLAG]].to_numpy(),
+    ))
+    
+    fig_bar_l3.update_layout(
+        height=dynamic_height_l3,
+        margin=dict(l=0, r=0, t=10, b=0),
+        yaxis={'categoryorder': 'array', 'categoryarray': _category_array(df_level3, 'Level 3')},
+        clickmode='event+select'
+    )
+    return fig_bar_l3
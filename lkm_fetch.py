@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from lkm_cache import CACHE_DIR
+from lkm_trace import checkpoint
+
+# Download export Google Sheet dengan conditional request (ETag / Last-Modified).
+# Isi terakhir disimpan di disk; kalau server menjawab 304, bytes lokal dipakai tanpa download ulang.
+# Nama file isi = URL + sha256 isinya, dan meta (ETag + sha256) ditulis setelah file isi: dua sesi yang
+# download bersamaan tidak bisa membuat meta menunjuk ke isi dari response lain.
+
+FETCH_DIR = os.path.join(CACHE_DIR, "remote")
+FETCH_TIMEOUT = 30
+FETCH_RETRIES = 3
+FETCH_CHUNK = 256 * 1024
+
+_session = None
+
+
+def get_session():
+    # Satu session per process supaya koneksi (keep-alive) dipakai ulang
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=FETCH_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+        )
+        _session = requests.Session()
+        _session.mount("http://", HTTPAdapter(max_retries=retry))
+        _session.mount("https://", HTTPAdapter(max_retries=retry))
+    return _session
+
+
+def _paths(url):
+    key = hashlib.sha256(url.encode()).hexdigest()
+    return key, os.path.join(FETCH_DIR, f"{key}.json")
+
+
+def _body_path(key, digest):
+    return os.path.join(FETCH_DIR, f"{key}-{digest}.xlsx")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _read_body(key, meta):
+    # None jika file isi sudah tidak ada (mis. dihapus sesi lain yang menyimpan isi lebih baru)
+    try:
+        with open(_body_path(key, meta["sha256"]), "rb") as f:
+            return f.read()
+    except (OSError, KeyError):
+        return None
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=FETCH_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale(key, keep_path):
+    # Isi lama URL ini (digest lain) tidak dipakai meta lagi
+    for name in os.listdir(FETCH_DIR):
+        path = os.path.join(FETCH_DIR, name)
+        if name.startswith(f"{key}-") and path != keep_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _get(url, meta, timeout):
+    # Return (header response, bytes); bytes None jika server menjawab 304
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    # Download per potongan: job background bisa dibatalkan di tengah download (checkpoint)
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as resp:
+        if resp.status_code == 304 and meta:
+            return resp.headers, None
+        resp.raise_for_status()
+        chunks = []
+        for chunk in resp.iter_content(FETCH_CHUNK):
+            checkpoint()
+            chunks.append(chunk)
+    return resp.headers, b"".join(chunks)
+
+
+def fetch_bytes(url, timeout=FETCH_TIMEOUT):
+    # Return (data, changed). changed=False jika isi sama dengan download sebelumnya.
+    key, meta_path = _paths(url)
+    meta = _read_meta(meta_path)
+
+    resp_headers, data = _get(url, meta, timeout)
+    if data is None:
+        data = _read_body(key, meta)
+        if data is not None:
+            return data, False
+        # Salinan lokal hilang -> download penuh tanpa header kondisional
+        resp_headers, data = _get(url, {}, timeout)
+
+    digest = hashlib.sha256(data).hexdigest()
+    changed = digest != meta.get("sha256")
+
+    os.makedirs(FETCH_DIR, exist_ok=True)
+    body_path = _body_path(key, digest)
+    if not os.path.exists(body_path):
+        _write_atomic(body_path, data)
+    new_meta = {
+        "etag": resp_headers.get("ETag"),
+        "last_modified": resp_headers.get("Last-Modified"),
+        "sha256": digest,
+    }
+    _write_atomic(meta_path, json.dumps(new_meta).encode())
+    _remove_stale(key, body_path)
+    return data, changed
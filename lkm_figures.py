@@ -0,0 +1,41 @@
+import threading
+from collections import OrderedDict
+
+# Cache figure Plotly per process (LRU). Key = fingerprint dataset + state filter/seleksi yang
+# memengaruhi grafik, jadi rerun karena widget lain tidak membangun ulang px.bar / px.imshow / dll.
+# Figure di cache dianggap read-only (st.plotly_chart hanya membaca lewat to_dict / to_json).
+
+FIGURE_CACHE_SIZE = 64
+
+_lock = threading.Lock()
+_figures = OrderedDict()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def cached_figure(key, builder, max_size=None):
+    with _lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            _figures.move_to_end(key)
+            _stats['hits'] += 1
+            return fig
+        _stats['misses'] += 1
+
+    fig = builder()
+    max_size = FIGURE_CACHE_SIZE if max_size is None else max_size
+    with _lock:
+        _figures[key] = fig
+        _figures.move_to_end(key)
+        while len(_figures) > max_size:
+            _figures.popitem(last=False)
+    return fig
+
+
+def clear_figures():
+    with _lock:
+        _figures.clear()
+
+
+def figure_cache_info():
+    with _lock:
+        return {'size': len(_figures), 'max_size': FIGURE_CACHE_SIZE, **_stats}
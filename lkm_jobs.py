@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+import uuid
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+
+from lkm_trace import watch
+
+# Job load / refresh di background thread: script Streamlit tidak diblok selama download & parsing.
+# Progress per tahap & per sheet diambil dari stage trace (lkm_trace.watch); pembatalan kooperatif,
+# dicek tiap awal stage, tiap sheet dari worker process & tiap potong download.
+# Hasil job baru dipakai pemanggil setelah selesai, jadi dataset lama tetap tampil sampai diganti.
+
+JOB_WORKERS = int(os.environ.get("LKM_JOB_WORKERS", "2"))
+# Stage yang menandai satu sheet selesai diproses (load penuh / streaming / refresh incremental)
+SHEET_DONE_STAGES = ('normalize', 'refresh_blocks')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class LoadCancelled(BaseException):
+    # Bukan turunan Exception: except Exception per sheet di parser (sheet rusak -> dilaporkan gagal)
+    # tidak boleh menelan pembatalan, sama seperti KeyboardInterrupt
+    pass
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="lkm-job")
+        return _pool
+
+
+class Job:
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.started = time.time()
+        self.finished = None
+        self.stages = []
+        self._cancel = threading.Event()
+        self._future = None
+
+    def _on_stage(self, record):
+        if self._cancel.is_set():
+            raise LoadCancelled(self.name)
+        if record is not None:
+            self.stages.append(record)
+
+    def _run(self, fn, args, kwargs):
+        try:
+            with watch(self._on_stage):
+                return fn(*args, **kwargs)
+        finally:
+            self.finished = time.time()
+
+    def cancel(self):
+        self._cancel.set()
+        self._future.cancel() # Belum sempat jalan -> langsung batal
+
+    def done(self):
+        return self._future.done()
+
+    def wait(self, timeout=None):
+        # Blok sampai job selesai (untuk batch / benchmark), return done()
+        futures.wait([self._future], timeout)
+        return self.done()
+
+    def result(self):
+        # Hasil fn; error dari fn (termasuk LoadCancelled) diteruskan ke pemanggil
+        if self._future.cancelled():
+            raise LoadCancelled(self.name)
+        return self._future.result()
+
+    @property
+    def status(self):
+        if self._future.cancelled():
+            return 'cancelled'
+        if not self._future.done():
+            if self._cancel.is_set():
+                return 'cancelling'
+            return 'running' if self._future.running() else 'queued'
+        error = self._future.exception()
+        if isinstance(error, LoadCancelled):
+            return 'cancelled'
+        return 'failed' if error is not None else 'done'
+
+    def progress(self, sheets_total=None):
+        # Ringkasan untuk UI: stage yang sedang jalan, jumlah sheet selesai, fraksi (0-1, None jika tidak diketahui).
+        # sheets_total None -> jumlah sheet yang cocok di workbook (target_sheets dari stage open_workbook)
+        stages = list(self.stages)
+        if sheets_total is None:
+            sheets_total = next((r['target_sheets'] for r in stages if r.get('target_sheets') is not None), None)
+        running = [r for r in stages if 'seconds' not in r]
+        sheets_done = {r['sheet'] for r in stages if r['stage'] in SHEET_DONE_STAGES and 'seconds' in r}
+        current = running[-1] if running else (stages[-1] if stages else None)
+        return {
+            'status': self.status,
+            'elapsed': round((self.finished or time.time()) - self.started, 1),
+            'current': current and (f"{current['sheet']}: " if current['sheet'] else "") + current['stage'],
+            'sheets_done': len(sheets_done),
+            'fraction': min(len(sheets_done) / sheets_total, 1.0) if sheets_total else None,
+            'stages': stages,
+        }
+
+
+def submit(name, fn, *args, **kwargs):
+    # Jalankan fn(*args, **kwargs) di thread pool, return Job (name hanya untuk tampilan / pesan)
+    job = Job(name)
+    job._future = _get_pool().submit(job._run, fn, args, kwargs)
+    return job
@@ -0,0 +1,548 @@
+import pandas as pd
+import numpy as np
+import datetime
+import hashlib
+import io
+import itertools
+import multiprocessing
+import operator
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from lkm_causes import canonical_causes
+from lkm_schema import clean_header, has_required_fields, resolve_columns
+from lkm_trace import collect, extend, stage
+
+# Parser workbook LKM (tanpa Streamlit) supaya bisa dipakai worker process pool.
+
+TARGET_SHEETS = ['Injection', 'Filling', 'Cutting', 'Packing']
+# Naikkan jika hasil parsing/normalisasi berubah (dipakai sebagai bagian key cache di disk)
+PARSER_VERSION = "7"
+
+# --- 1. FUNGSI PEMBERSIH ---
+def clean_downtime_value(val):
+    if pd.isna(val) or val == '' or val == '-': return 0
+    if isinstance(val, (int, float)): return val
+    if isinstance(val, datetime.time): return (val.hour * 60) + val.minute + (val.second / 60)
+    if isinstance(val, pd.Timedelta): return val.total_seconds() / 60
+    try: return float(str(val).strip())
+    except: return 0
+
+def clean_shift(val):
+    if pd.isna(val): return "Unknown"
+    s = str(val).strip().replace('.0', '')
+    if s in ['1', '2', '3']: return f"Shift {s}"
+    return s
+
+# --- 1b. VERSI VEKTOR (SATU KOLOM SEKALIGUS) ---
+# Hasilnya sama dengan fungsi skalar di atas, tapi diproses per kolom (bukan per sel).
+# Kolom object dari read_excel dipilah sekali per tipe sel (kode tipe, bukan Series.map(type));
+# datetime.time diambil jam/menit/detiknya langsung, angka & teks angka lewat konversi numpy/pandas.
+# Nilai aneh yang tidak bisa divektorkan (mis. '1_000', 'nan', bool) dilempar balik ke fungsi skalar.
+_NUMBER, _TIME, _TIMEDELTA, _TEXT, _DATETIME, _DATE = range(1, 7)
+# Tipe persis (bool / numpy scalar bukan int / float di sini -> kode 0 = tipe lain)
+_KIND_CODES = {
+    int: _NUMBER, float: _NUMBER, datetime.time: _TIME, pd.Timedelta: _TIMEDELTA, str: _TEXT,
+    datetime.datetime: _DATETIME, pd.Timestamp: _DATETIME, datetime.date: _DATE,
+}
+
+def _kinds(values):
+    # Kode tipe per sel; map builtin (tanpa panggilan fungsi Python per sel)
+    codes = map(_KIND_CODES.get, map(type, values), itertools.repeat(0))
+    return np.fromiter(codes, dtype=np.int8, count=len(values))
+
+def _time_seconds(times):
+    # datetime.time -> detik sejak 00:00 (tanpa mikrodetik)
+    return np.fromiter((t.hour * 3600 + t.minute * 60 + t.second for t in times), dtype=np.int64, count=len(times))
+
+def clean_downtime_series(s):
+    if pd.api.types.is_numeric_dtype(s):
+        return s.fillna(0)
+    if pd.api.types.is_timedelta64_dtype(s):
+        return (s.dt.total_seconds() / 60).fillna(0)
+
+    values = s.to_numpy(dtype=object)
+    kinds = _kinds(values)
+    out = np.zeros(len(values))
+
+    is_number = kinds == _NUMBER
+    if is_number.any():
+        numbers = values[is_number].astype(float)
+        out[is_number] = np.where(np.isnan(numbers), 0, numbers)
+
+    is_time = kinds == _TIME
+    if is_time.any():
+        out[is_time] = _time_seconds(values[is_time]) / 60
+
+    is_td = kinds == _TIMEDELTA
+    if is_td.any():
+        out[is_td] = pd.to_timedelta(values[is_td]).total_seconds() / 60
+
+    # Teks: '' / '-' = 0, teks angka lewat to_numeric; sisanya (gagal di-parse, bool, numpy scalar,
+    # datetime, dll) ke fungsi skalar. None / NaT tetap 0
+    leftover = ~(is_number | is_time | is_td) & ~pd.isna(values)
+    is_str = kinds == _TEXT
+    if is_str.any():
+        positions = np.flatnonzero(is_str)
+        texts = values[positions]
+        blank = np.isin(texts, ['', '-'])
+        leftover[positions[blank]] = False
+        positions, texts = positions[~blank], texts[~blank]
+        num = pd.to_numeric(pd.Series(texts, dtype=object), errors='coerce').to_numpy(float)
+        parsed = ~np.isnan(num)
+        out[positions[parsed]] = num[parsed]
+        leftover[positions[parsed]] = False
+    if leftover.any():
+        out[leftover] = [float(clean_downtime_value(v)) for v in values[leftover]]
+    return pd.Series(out, index=s.index)
+
+def to_datetime_series(s):
+    # Hanya datetime / date / teks tanggal yang dianggap tanggal; angka & nilai lain -> NaT
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    out = pd.Series(pd.NaT, index=s.index, dtype='datetime64[ns]')
+    kinds = _kinds(s.to_numpy(dtype=object))
+    is_dt = np.isin(kinds, [_DATETIME, _DATE, _TEXT])
+    if is_dt.any():
+        out[is_dt] = pd.to_datetime(s[is_dt], errors='coerce')
+    return out
+
+def to_time_of_day_series(s):
+    # Jam dalam sehari sebagai timedelta sejak 00:00 (datetime.time atau bagian jam dari datetime)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s - s.dt.normalize()
+    values = s.to_numpy(dtype=object)
+    kinds = _kinds(values)
+    out = np.full(len(values), np.timedelta64('NaT', 'ns'))
+
+    is_time = kinds == _TIME
+    if is_time.any():
+        out[is_time] = _time_seconds(values[is_time]) * np.timedelta64(1, 's')
+
+    is_dt = kinds == _DATETIME
+    if is_dt.any():
+        stamps = pd.DatetimeIndex(values[is_dt])
+        out[is_dt] = (stamps - stamps.normalize()).to_numpy()
+    return pd.Series(out, index=s.index, dtype='timedelta64[ns]')
+
+# --- 2. DETEKSI HEADER ---
+# Sheet dibaca sekali tanpa header, lalu baris teratas diberi skor untuk mencari baris header.
+HEADER_SCAN_ROWS = 10
+
+def score_header_row(values):
+    # Kandidat header harus punya kolom Machine & Downtime (REQUIRED_FIELDS di lkm_schema)
+    cells = [clean_header(v) for v in values if pd.notna(v)]
+    if not has_required_fields(cells): return 0
+    # Baris header asli biasanya punya kolom terisi paling banyak
+    return len(cells)
+
+def detect_header_row(raw, max_rows=HEADER_SCAN_ROWS, sheet_name=None):
+    with stage('detect_header', sheet_name) as record:
+        best_row, best_score = None, 0
+        attempts = min(max_rows, len(raw))
+        for i in range(attempts):
+            score = score_header_row(raw.iloc[i].tolist())
+            if score > best_score:
+                best_row, best_score = i, score
+        record.update(attempts=attempts, header_row=best_row)
+    return best_row
+
+def header_names(values):
+    # Sama seperti pd.read_excel(header=n): sel kosong -> "Unnamed: i", nama dobel -> "nama.1"
+    names, seen = [], {}
+    for i, val in enumerate(values):
+        name = f"Unnamed: {i}" if pd.isna(val) else val
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def promote_header(raw, header_row):
+    df = raw.iloc[header_row + 1:].reset_index(drop=True)
+    df.columns = header_names(raw.iloc[header_row].tolist())
+    return df.infer_objects()
+
+# --- 3. NORMALISASI SHEET ---
+# Field -> kolom asli lewat registry skema (lkm_schema); hasil di-cache per signature header.
+# Kolom yang tidak dikenal / ambigu / dobel dicatat di record stage trace (panel debug & trace JSON).
+def build_col_map(columns, record=None):
+    mapping = resolve_columns(columns)
+    if record is not None:
+        if mapping['unmapped']:
+            record['unmapped'] = ", ".join(map(str, mapping['unmapped']))
+        if mapping['ambiguous']:
+            record['ambiguous'] = "; ".join(f"{col} -> {'|'.join(fields)}" for col, fields in mapping['ambiguous'].items())
+        if mapping['duplicates']:
+            record['duplicates'] = "; ".join(f"{field}: {', '.join(map(str, cols))}" for field, cols in mapping['duplicates'].items())
+    return mapping['col_map']
+
+def normalize_sheet(df, matched_target, sheet_name=None):
+    with stage('normalize', sheet_name, rows=len(df)) as record:
+        temp_data = _normalize_sheet(df, matched_target, build_col_map(df.columns, record))
+        record['rows_out'] = len(temp_data)
+    return temp_data
+
+def _normalize_sheet(df, matched_target, col_map):
+    temp_data = pd.DataFrame()
+    temp_data['Area'] = [matched_target] * len(df)
+
+    # Tanggal & jam disimpan sebagai datetime64 / timedelta64, format tampilan baru dibuat saat render
+    if 'Date' in col_map:
+        temp_data['Date_Raw'] = to_datetime_series(df[col_map['Date']])
+    else:
+        temp_data['Date_Raw'] = pd.NaT
+
+    temp_data['Jam'] = to_time_of_day_series(df[col_map['Time']]) if 'Time' in col_map else np.timedelta64('NaT', 'ns')
+    temp_data['Nama Mesin'] = df[col_map['Machine']]
+
+    temp_data['Machine Type'] = df[col_map['Type']] if 'Type' in col_map else "-"
+    temp_data['Machine Brand'] = df[col_map['Brand']] if 'Brand' in col_map else "-"
+
+    # AMBIL REGU
+    temp_data['Regu'] = df[col_map['Regu']].astype(str) if 'Regu' in col_map else "-"
+
+    l2 = df[col_map['Category']].fillna('') if 'Category' in col_map else ""
+    l3 = df[col_map['Cause']].fillna('') if 'Cause' in col_map else ""
+    temp_data['Penyebab'] = l2.astype(str) + " - " + l3.astype(str)
+    temp_data['Tindakan'] = df[col_map['Action']] if 'Action' in col_map else "-"
+    temp_data['Total Downtime (Menit)'] = clean_downtime_series(df[col_map['Downtime']])
+
+    temp_data['Stop Date'] = to_datetime_series(df[col_map['StopDate']]) if 'StopDate' in col_map else pd.NaT
+    temp_data['Start Repair'] = to_time_of_day_series(df[col_map['StartRepair']]) if 'StartRepair' in col_map else np.timedelta64('NaT', 'ns')
+    temp_data['Stop Repair'] = to_time_of_day_series(df[col_map['StopRepair']]) if 'StopRepair' in col_map else np.timedelta64('NaT', 'ns')
+    temp_data['Start Production'] = to_time_of_day_series(df[col_map['StartProduction']]) if 'StartProduction' in col_map else np.timedelta64('NaT', 'ns')
+    temp_data['Level 3'] = l3
+    temp_data['Respon Time'] = clean_downtime_series(df[col_map['ResponTime']]) if 'ResponTime' in col_map else 0
+    temp_data['Technical Downtime'] = clean_downtime_series(df[col_map['TechDowntime']]) if 'TechDowntime' in col_map else 0
+    temp_data['PIC'] = df[col_map['PIC']] if 'PIC' in col_map else "-"
+
+    return temp_data.dropna(subset=['Nama Mesin'])
+
+# --- 3b. SKEMA KANONIK ---
+# Kolom label berulang -> category, teks bebas -> str, menit -> float32, tanggal -> datetime64, jam -> timedelta64.
+# Dipasang sekali setelah semua sheet digabung (concat category beda isi akan jadi object lagi).
+CATEGORY_COLUMNS = ['Area', 'Nama Mesin', 'Machine Type', 'Machine Brand', 'Regu', 'Penyebab', 'Level 3', 'PIC']
+MINUTE_COLUMNS = ['Total Downtime (Menit)', 'Respon Time', 'Technical Downtime']
+DATE_COLUMNS = ['Date_Raw', 'Stop Date']
+TIME_COLUMNS = ['Jam', 'Start Repair', 'Stop Repair', 'Start Production']
+# Sel angka di kolom teks (mis. Tindakan "101") membuat kolom object campuran yang ditolak Parquet
+TEXT_COLUMNS = ['Tindakan']
+
+def to_label_category(s):
+    # Semua label jadi teks (angka 101 dan teks "101" dianggap sama), str() hanya dipanggil per nilai unik
+    codes, uniques = pd.factorize(s)
+    labels = pd.Index(np.asarray(uniques, dtype=object), dtype=object).map(str)
+    label_codes, categories = pd.factorize(labels)
+    codes = np.where(codes >= 0, label_codes[codes] if len(label_codes) else codes, -1)
+    cat = pd.Categorical.from_codes(codes, categories)
+    return pd.Series(cat.reorder_categories(categories.sort_values()), index=s.index, name=s.name)
+
+def level3_short(s):
+    # Label Level 3 untuk grafik & drill-down = penyebab kanonik (ejaan / typo yang sama digabung),
+    # dihitung per kategori, bukan per baris. Lihat lkm_causes.
+    cat = s if isinstance(s.dtype, pd.CategoricalDtype) else to_label_category(s)
+    return canonical_causes(cat)
+
+def to_canonical(df):
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = to_label_category(df[col])
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('str') # NaN tetap NaN
+    if 'Level 3' in df.columns:
+        df['Level 3 Short'] = level3_short(df['Level 3'])
+    for col in MINUTE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('datetime64[ns]')
+    for col in TIME_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('timedelta64[ns]')
+    return df
+
+def combine_frames(frames, header_rows):
+    # Gabungkan hasil per sheet jadi satu frame berskema kanonik
+    if not frames:
+        return pd.DataFrame()
+    with stage('concat', frames=len(frames)) as record:
+        df = pd.concat(frames, ignore_index=True)
+        df.attrs.pop('ingest', None) # Satu sheet saja -> attrs ikut ke hasil concat
+        record['rows'] = len(df)
+    with stage('canonical', rows=len(df)):
+        df = to_canonical(df)
+    # Baris header yang dipakai per sheet (0-based, sama seperti parameter header= di pd.read_excel)
+    df.attrs['header_rows'] = header_rows
+    return df
+
+# --- 4. PARSE PER SHEET ---
+def match_target(sheet_name):
+    return next((t for t in TARGET_SHEETS if t.lower() in sheet_name.lower()), None)
+
+def parse_sheet(xls, sheet_name, matched_target):
+    # Return (temp_data, header_row); temp_data None jika header tidak ditemukan / sheet rusak
+    # Error tetap ditelan (sheet dilaporkan gagal), tapi tercatat di trace stage yang gagal
+    try:
+        raw = read_sheet(xls, sheet_name)
+        header_row = detect_header_row(raw, sheet_name=sheet_name)
+        if header_row is None:
+            return None, None
+        df = promote_header(raw, header_row)
+        temp_data = normalize_sheet(df, matched_target, sheet_name)
+        # Fingerprint blok ikut dikirim (attrs, juga dari worker) -> Refresh pertama sudah incremental
+        temp_data.attrs['ingest'] = sheet_state(df, header_row, sheet_name)
+        return temp_data, header_row
+    except Exception:
+        return None, None
+
+def read_sheet(xls, sheet_name):
+    with stage('read_sheet', sheet_name) as record:
+        raw = pd.read_excel(xls, sheet_name=sheet_name, header=None)
+        record['rows'] = len(raw)
+    return raw
+
+def count_targets(sheet_names):
+    # Jumlah sheet yang akan diproses (dicatat di stage open_workbook -> total progress job)
+    return sum(1 for sheet_name in sheet_names if match_target(sheet_name))
+
+def open_workbook(source):
+    with stage('open_workbook', bytes=len(source) if isinstance(source, bytes) else None) as record:
+        xls = pd.ExcelFile(io.BytesIO(source) if isinstance(source, bytes) else source)
+        record['target_sheets'] = count_targets(xls.sheet_names)
+        return xls
+
+def _parse_sheet_worker(source, sheet_name, matched_target, streaming=False):
+    # Worker process: buka workbook sendiri (read-only), parse satu sheet saja.
+    # Return (hasil parse, record trace worker) -> record digabung ke trace di process utama
+    with collect() as records:
+        if streaming:
+            wb = open_workbook_streaming(source)
+            try:
+                result = parse_sheet_streaming(wb, sheet_name, matched_target)
+            finally:
+                wb.close()
+        else:
+            with open_workbook(source) as xls:
+                result = parse_sheet(xls, sheet_name, matched_target)
+    return result, records
+
+def _is_url(source):
+    return source.startswith(("http://", "https://"))
+
+def read_source_bytes(source):
+    # Path, URL & file upload dibaca sekali jadi bytes (untuk hash cache & dikirim ke worker).
+    # URL lewat fetch_bytes: conditional request + salinan lokal di disk.
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with stage('read_source') as record:
+        if isinstance(source, str) and _is_url(source):
+            from lkm_fetch import fetch_bytes # requests hanya perlu untuk sumber URL
+            record['kind'] = 'url'
+            data, record['changed'] = fetch_bytes(source)
+        elif isinstance(source, str):
+            record['kind'] = 'path'
+            with open(source, "rb") as f:
+                data = f.read()
+        else:
+            record['kind'] = 'upload'
+            data = source.getvalue() if hasattr(source, "getvalue") else source.read()
+        record['bytes'] = len(data)
+    return data
+
+# --- 5. LOAD SEMUA SHEET ---
+def load_sheets(source, parallel=False, max_workers=None, streaming=False):
+    # Return (frames, header_rows, failed_sheets). Urutan frames selalu mengikuti urutan sheet di workbook.
+    # Worker & openpyxl tidak bisa membaca URL / objek upload langsung -> ambil bytes-nya dulu
+    if parallel or (streaming and not (isinstance(source, str) and not _is_url(source))):
+        source = read_source_bytes(source)
+    if streaming:
+        book = open_workbook_streaming(source)
+        sheet_names, parse = book.sheetnames, parse_sheet_streaming
+    else:
+        book = open_workbook(source)
+        sheet_names, parse = book.sheet_names, parse_sheet
+    tasks = [(sheet_name, match_target(sheet_name)) for sheet_name in sheet_names]
+    tasks = [(sheet_name, target) for sheet_name, target in tasks if target]
+
+    if parallel and len(tasks) > 1:
+        book.close()
+        workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+        # spawn: aman dipanggil dari server Streamlit yang multi-thread
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = []
+            for result, records in pool.map(_parse_sheet_worker, [source] * len(tasks), *zip(*tasks), [streaming] * len(tasks)):
+                results.append(result)
+                extend(records)
+    else:
+        try:
+            results = [parse(book, sheet_name, target) for sheet_name, target in tasks]
+        finally:
+            book.close() # openpyxl read-only menahan file / buffer sampai ditutup, juga saat job dibatalkan
+
+    frames, header_rows, failed = [], {}, []
+    for (sheet_name, _), (temp_data, header_row) in zip(tasks, results):
+        if temp_data is None:
+            failed.append(sheet_name)
+            continue
+        header_rows[sheet_name] = header_row
+        if not temp_data.empty:
+            frames.append(temp_data)
+    return frames, header_rows, failed
+
+# --- 6. INCREMENTAL REFRESH ---
+# Sheet LKM kebanyakan hanya bertambah di bawah. Baris dikelompokkan per blok dan tiap blok diberi
+# fingerprint; blok yang sama dengan refresh sebelumnya diambil langsung dari df lama (tanpa dibersihkan ulang).
+BLOCK_ROWS = 1000
+
+def block_fingerprints(df, block_rows=None):
+    block_rows = BLOCK_ROWS if block_rows is None else block_rows
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return [hashlib.blake2b(row_hash[i:i + block_rows].tobytes(), digest_size=16).hexdigest()
+            for i in range(0, len(row_hash), block_rows)]
+
+def _sheet_columns(df):
+    # Nama kolom sebagai teks -> state bisa disimpan sebagai JSON (attrs Parquet di cache disk)
+    return [str(col) for col in df.columns]
+
+def sheet_state(df, header_row, sheet_name=None, block_rows=None):
+    # State satu sheet dari load penuh: fingerprint blok + jumlah baris hasil normalize_sheet per blok
+    # (baris tanpa Nama Mesin dibuang). Offset sheet di df gabungan diisi initial_state.
+    block_rows = BLOCK_ROWS if block_rows is None else block_rows
+    with stage('fingerprint', sheet_name) as record:
+        kept = df[build_col_map(df.columns)['Machine']].notna().to_numpy()
+        blocks = [(fingerprint, int(kept[i * block_rows:(i + 1) * block_rows].sum()))
+                  for i, fingerprint in enumerate(block_fingerprints(df, block_rows))]
+        record['blocks'] = len(blocks)
+    return {'sheet_name': sheet_name, 'header_row': header_row, 'columns': _sheet_columns(df), 'blocks': blocks}
+
+def initial_state(frames):
+    # State refresh dari frames load_sheets (urutan sama dengan df gabungan). Dipanggil sebelum
+    # combine_frames. Sheet tanpa fingerprint (mode streaming) dibersihkan penuh di refresh berikutnya.
+    sheets, offset = {}, 0
+    for temp_data in frames:
+        sheet = temp_data.attrs.pop('ingest', None)
+        if sheet is not None:
+            sheets[sheet.pop('sheet_name')] = {**sheet, 'offset': offset}
+        offset += len(temp_data)
+    return {'n_rows': offset, 'sheets': sheets}
+
+def _refresh_sheet(df, matched_target, prev_df, prev_sheet, block_rows, sheet_name=None):
+    # Return (temp_data, blocks, reused) dengan blocks = [(fingerprint, jumlah baris hasil normalisasi), ...]
+    # dan reused = jumlah blok yang diambil dari prev_df
+    prev_blocks, prev_pos = [], 0
+    if prev_sheet is not None and list(prev_sheet['columns']) == _sheet_columns(df):
+        prev_blocks, prev_pos = prev_sheet['blocks'], prev_sheet['offset']
+
+    parts, blocks, reused = [], [], 0
+    for i, fingerprint in enumerate(block_fingerprints(df, block_rows)):
+        if i < len(prev_blocks) and prev_blocks[i][0] == fingerprint:
+            part = prev_df.iloc[prev_pos:prev_pos + prev_blocks[i][1]]
+            reused += 1
+        else:
+            block = df.iloc[i * block_rows:(i + 1) * block_rows].reset_index(drop=True)
+            part = normalize_sheet(block, matched_target, sheet_name)
+        if i < len(prev_blocks):
+            prev_pos += prev_blocks[i][1]
+        parts.append(part)
+        blocks.append((fingerprint, len(part)))
+
+    temp_data = pd.concat(parts, ignore_index=True) if parts else normalize_sheet(df, matched_target, sheet_name)
+    return temp_data, blocks, reused
+
+def load_incremental(source, prev_df=None, prev_state=None, block_rows=None):
+    # Sama seperti load_sheets, plus state untuk refresh berikutnya: (frames, header_rows, failed_sheets, state).
+    # prev_state hanya valid untuk prev_df hasil pd.concat(frames, ignore_index=True) dari panggilan sebelumnya.
+    block_rows = BLOCK_ROWS if block_rows is None else block_rows
+    prev_sheets = {}
+    if prev_df is not None and prev_state and prev_state['n_rows'] == len(prev_df):
+        prev_sheets = prev_state['sheets']
+
+    frames, header_rows, failed, sheets = [], {}, [], {}
+    offset = 0
+    with open_workbook(source) as xls:
+        for sheet_name in xls.sheet_names:
+            matched_target = match_target(sheet_name)
+            if not matched_target:
+                continue
+            try:
+                raw = read_sheet(xls, sheet_name)
+                header_row = detect_header_row(raw, sheet_name=sheet_name)
+                if header_row is None:
+                    failed.append(sheet_name)
+                    continue
+                df = promote_header(raw, header_row)
+                prev_sheet = prev_sheets.get(sheet_name)
+                if prev_sheet is not None and prev_sheet['header_row'] != header_row:
+                    prev_sheet = None
+                with stage('refresh_blocks', sheet_name) as record:
+                    temp_data, blocks, reused = _refresh_sheet(df, matched_target, prev_df, prev_sheet, block_rows, sheet_name)
+                    record.update(blocks=len(blocks), reused=reused)
+            except Exception:
+                failed.append(sheet_name)
+                continue
+
+            header_rows[sheet_name] = header_row
+            sheets[sheet_name] = {'header_row': header_row, 'columns': _sheet_columns(df), 'blocks': blocks, 'offset': offset}
+            if not temp_data.empty:
+                frames.append(temp_data)
+                offset += len(temp_data)
+
+    return frames, header_rows, failed, {'n_rows': offset, 'sheets': sheets}
+
+# --- 7. STREAMING READER (openpyxl read-only) ---
+# Baris dibaca satu per satu lewat iter_rows, hanya kolom yang ada di col_map yang disimpan,
+# dan tiap STREAM_CHUNK_ROWS baris langsung dinormalisasi supaya data mentah tidak menumpuk di memori.
+STREAM_CHUNK_ROWS = 20000
+
+def open_workbook_streaming(source):
+    import openpyxl # Hanya dipakai mode streaming
+    with stage('open_workbook', bytes=len(source) if isinstance(source, bytes) else None, streaming=True) as record:
+        wb = openpyxl.load_workbook(io.BytesIO(source) if isinstance(source, bytes) else source, read_only=True, data_only=True)
+        record['target_sheets'] = count_targets(wb.sheetnames)
+        return wb
+
+def parse_sheet_streaming(wb, sheet_name, matched_target, chunk_rows=STREAM_CHUNK_ROWS):
+    # Sama seperti parse_sheet: return (temp_data, header_row)
+    # Stage stream_sheet mencakup baca baris + normalisasi per chunk (normalize tercatat terpisah)
+    try:
+        with stage('stream_sheet', sheet_name) as record:
+            rows = wb[sheet_name].iter_rows(values_only=True)
+            head = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+            header_row = detect_header_row(pd.DataFrame(head), sheet_name=sheet_name)
+            if header_row is None:
+                return None, None
+
+            names = header_names(head[header_row])
+            col_map = build_col_map(names, record)
+            keep = sorted({names.index(col) for col in col_map.values()})
+            keep_names = [names[i] for i in keep]
+            width = keep[-1] + 1
+            pick = operator.itemgetter(*keep)
+
+            chunks, buffer = [], []
+            def flush():
+                columns = list(zip(*buffer)) or [[] for _ in keep_names]
+                chunk = pd.DataFrame({name: list(values) for name, values in zip(keep_names, columns)})
+                chunks.append(normalize_sheet(chunk, matched_target, sheet_name))
+                buffer.clear()
+
+            n_rows = 0
+            for row in itertools.chain(head[header_row + 1:], rows):
+                n_rows += 1
+                if len(row) < width:
+                    row = row + (None,) * (width - len(row))
+                buffer.append(pick(row))
+                if len(buffer) >= chunk_rows:
+                    flush()
+            if buffer or not chunks:
+                flush()
+
+            record.update(rows=n_rows, chunks=len(chunks))
+            return pd.concat(chunks, ignore_index=True), header_row
+    except Exception:
+        return None, None
@@ -0,0 +1,82 @@
+import threading
+import weakref
+
+# Dataset bersama per process: sesi yang membuka workbook dengan isi sama memakai SATU DataFrame.
+# Sesi hanya menyimpan DatasetHandle (+ state filter); handle hilang (sesi ditutup / ganti file)
+# -> ref count turun, dan dataset dibuang dari memori saat tidak ada sesi yang memakainya lagi.
+# Frame dianggap read-only; pandas Copy-on-Write menjamin perubahan di hasil turunan tidak ikut
+# mengubah frame bersama.
+
+_lock = threading.Lock()
+_datasets = {}
+
+
+class DatasetHandle:
+    __slots__ = ('key', '__weakref__')
+
+    def __init__(self, key):
+        self.key = key
+
+
+def acquire(key, df, state=None):
+    # Kalau key sudah terdaftar, df baru dibuang dan frame yang sudah ada yang dipakai.
+    # state = state refresh incremental milik frame ini (read-only, dibagi antar sesi)
+    with _lock:
+        entry = _datasets.get(key)
+        if entry is None:
+            entry = _datasets[key] = {'df': df, 'state': state, 'refs': 0, 'views': {}}
+        elif entry['state'] is None:
+            entry['state'] = state
+        entry['refs'] += 1
+    handle = DatasetHandle(key)
+    weakref.finalize(handle, release, key)
+    return handle
+
+
+def release(key):
+    with _lock:
+        entry = _datasets.get(key)
+        if entry is None:
+            return
+        entry['refs'] -= 1
+        if entry['refs'] <= 0:
+            del _datasets[key]
+
+
+def lookup(key):
+    with _lock:
+        entry = _datasets.get(key)
+        return entry['df'] if entry is not None else None
+
+
+def state(key):
+    with _lock:
+        entry = _datasets.get(key)
+        return entry['state'] if entry is not None else None
+
+
+def frame(handle):
+    return _datasets[handle.key]['df']
+
+
+def view(handle, name, builder):
+    # Struktur turunan (cube, index, ...) juga dibagi antar sesi, dihitung sekali per dataset
+    entry = _datasets[handle.key]
+    views = entry['views']
+    if name not in views:
+        result = builder(entry['df'])
+        with _lock:
+            views.setdefault(name, result)
+    return views[name]
+
+
+def stats():
+    with _lock:
+        entries = list(_datasets.items())
+    return [{
+        'key': key[:16],
+        'refs': entry['refs'],
+        'rows': len(entry['df']),
+        'mb': round(float(entry['df'].memory_usage(deep=True).sum()) / 1024 / 1024, 1),
+        'views': sorted(entry['views']),
+    } for key, entry in entries]
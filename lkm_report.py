@@ -0,0 +1,225 @@
+import argparse
+import datetime
+import glob
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from downtime_engine import load_workbook, report_tables
+from lkm_loader import to_canonical
+from lkm_store import row_keys
+
+# Laporan downtime batch dari command line (tanpa Streamlit), mis. dijadwalkan tiap malam:
+#   python lkm_report.py data/LKM_*.xlsx --out laporan --format xlsx,html --last-days 7 --combine
+# Tiap file diproses di process terpisah; hasil parse disimpan/diambil dari cache Parquet di disk,
+# jadi file yang tidak berubah sejak run sebelumnya tidak di-parse ulang.
+
+FORMATS = ['xlsx', 'csv', 'html']
+
+
+def expand_paths(paths):
+    # Argumen boleh berupa file atau folder (semua .xlsx di dalamnya)
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, "*.xlsx")))
+        else:
+            files.append(path)
+    files = [f for f in files if not os.path.basename(f).startswith("~$")] # File lock Excel
+    return list(dict.fromkeys(files))
+
+
+def report_stems(paths):
+    # Nama file laporan per workbook = nama file tanpa ekstensi. Nama sama dari folder berbeda
+    # (mis. Jan/LKM.xlsx & Feb/LKM.xlsx) diberi awalan nama folder; sisa bentrok diberi akhiran _2, _3, ...
+    # Dibandingkan tanpa beda huruf besar/kecil (file system Windows / macOS).
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    counts = Counter(stem.lower() for stem in stems)
+    stems = [
+        f"{os.path.basename(os.path.dirname(os.path.abspath(path)))}_{stem}" if counts[stem.lower()] > 1 else stem
+        for path, stem in zip(paths, stems)
+    ]
+    taken, unique = set(), []
+    for stem in stems:
+        candidate, n = stem, 1
+        while candidate.lower() in taken:
+            n += 1
+            candidate = f"{stem}_{n}"
+        taken.add(candidate.lower())
+        unique.append(candidate)
+    return unique
+
+
+def resolve_period(df, start_date=None, end_date=None, last_days=None):
+    # --last-days dihitung mundur dari tanggal terakhir di data (bukan hari ini)
+    if last_days and not df.empty and df['Date_Raw'].notna().any():
+        end_date = df['Date_Raw'].max().normalize()
+        start_date = end_date - pd.Timedelta(days=last_days - 1)
+    return start_date, end_date
+
+
+def _slug(text):
+    return re.sub(r"[^0-9a-zA-Z]+", "_", text).strip("_").lower()
+
+
+def write_xlsx(tables, path):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, table in tables.items():
+            table.to_excel(writer, sheet_name=name[:31], index=(name == 'Heatmap Regu'))
+    return [path]
+
+
+def write_csv(tables, path):
+    stem = os.path.splitext(path)[0]
+    outputs = []
+    for name, table in tables.items():
+        out = f"{stem}_{_slug(name)}.csv"
+        table.to_csv(out, index=(name == 'Heatmap Regu'))
+        outputs.append(out)
+    return outputs
+
+
+def write_html(tables, path, title):
+    from lkm_charts import bar_figure, heatmap_figure
+
+    charts = []
+    if not tables['Downtime per Mesin'].empty:
+        charts.append(("Total Downtime per Mesin", bar_figure(tables['Downtime per Mesin'])))
+    if not tables['Heatmap Regu'].empty:
+        charts.append(("Jumlah Downtime Mesin berdasarkan Regu", heatmap_figure(tables['Heatmap Regu'])))
+
+    parts = [f"<html><head><meta charset='utf-8'><title>{title}</title></head><body>", f"<h1>{title}</h1>"]
+    parts.append(tables['Ringkasan'].to_html(index=False))
+    for i, (caption, fig) in enumerate(charts):
+        parts.append(f"<h2>{caption}</h2>")
+        parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn" if i == 0 else False))
+    for name in ['Downtime per Mesin', 'Level 3']:
+        parts.append(f"<h2>{name}</h2>")
+        parts.append(tables[name].to_html(index=False, float_format=lambda v: f"{v:,.0f}"))
+    parts.append("</body></html>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    return [path]
+
+
+def write_report(tables, out_dir, stem, formats, title):
+    outputs = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{stem}.{fmt}")
+        if fmt == 'xlsx':
+            outputs += write_xlsx(tables, path)
+        elif fmt == 'csv':
+            outputs += write_csv(tables, path)
+        elif fmt == 'html':
+            outputs += write_html(tables, path, title)
+    return outputs
+
+
+def build_report(path, options, stem=None):
+    # Worker: satu workbook -> file laporan. Error dikembalikan (bukan raise) supaya file lain tetap jalan.
+    # stem = nama file output dari report_stems (default: nama file workbook)
+    t0 = time.perf_counter()
+    result = {'path': path, 'outputs': [], 'rows': 0, 'error': None}
+    try:
+        df, _, failed_sheets = load_workbook(path, use_cache=options['use_cache'])
+        result['failed_sheets'] = failed_sheets
+        if df.empty:
+            raise ValueError("data kosong / header tidak ditemukan")
+        start_date, end_date = resolve_period(df, options['start_date'], options['end_date'], options['last_days'])
+        tables = report_tables(df, options['areas'], start_date, end_date)
+        result['rows'] = int(tables['Ringkasan'].set_index('Keterangan').loc['Jumlah Kejadian', 'Nilai'])
+        stem = stem or os.path.splitext(os.path.basename(path))[0]
+        result['outputs'] = write_report(tables, options['out_dir'], stem, options['formats'], f"Laporan Downtime - {stem}")
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - t0, 2)
+    return result
+
+
+def build_combined(paths, options):
+    # Laporan gabungan: frame dari cache disk (sudah ditulis worker), baris yang sama di beberapa file
+    # (mis. LKM kumulatif) hanya dihitung sekali
+    frames, keys = [], []
+    for path in paths:
+        df, _, _ = load_workbook(path, use_cache=options['use_cache'])
+        if not df.empty:
+            df = df.drop(columns=['Level 3 Short'])
+            frames.append(df)
+            keys.append(row_keys(df)) # Key per file, sama seperti ingest histori
+    if not frames:
+        return []
+    df = pd.concat(frames, ignore_index=True)
+    df = to_canonical(df[~pd.Series(np.concatenate(keys)).duplicated().to_numpy()].reset_index(drop=True))
+    start_date, end_date = resolve_period(df, options['start_date'], options['end_date'], options['last_days'])
+    tables = report_tables(df, options['areas'], start_date, end_date)
+    stem = f"gabungan_{datetime.date.today():%Y%m%d}"
+    return write_report(tables, options['out_dir'], stem, options['formats'], "Laporan Downtime - Gabungan")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Laporan downtime LKM (Excel/CSV/HTML) tanpa Streamlit")
+    parser.add_argument('paths', nargs='+', help="File .xlsx atau folder berisi file .xlsx")
+    parser.add_argument('--out', default="laporan", help="Folder output (default: laporan)")
+    parser.add_argument('--format', default="xlsx", help="Format, dipisah koma: " + ",".join(FORMATS))
+    parser.add_argument('--start', type=datetime.date.fromisoformat, help="Tanggal awal (YYYY-MM-DD)")
+    parser.add_argument('--end', type=datetime.date.fromisoformat, help="Tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument('--last-days', type=int, help="N hari terakhir dari tanggal terakhir di data (mengganti --start/--end)")
+    parser.add_argument('--areas', help="Area, dipisah koma (default: semua)")
+    parser.add_argument('--combine', action='store_true', help="Tambahkan satu laporan gabungan semua file")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah process (default: jumlah CPU)")
+    parser.add_argument('--no-cache', action='store_true', help="Selalu parse ulang (abaikan cache di disk)")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip() for fmt in args.format.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"format tidak dikenal: {', '.join(unknown)}")
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.error("tidak ada file .xlsx")
+
+    os.makedirs(args.out, exist_ok=True)
+    options = {
+        'out_dir': args.out,
+        'formats': formats,
+        'start_date': args.start,
+        'end_date': args.end,
+        'last_days': args.last_days,
+        'areas': [area.strip() for area in args.areas.split(",")] if args.areas else None,
+        'use_cache': not args.no_cache,
+    }
+
+    stems = report_stems(paths)
+    workers = min(len(paths), args.workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(build_report, paths, [options] * len(paths), stems))
+    else:
+        results = [build_report(path, options, stem) for path, stem in zip(paths, stems)]
+
+    for result in results:
+        if result['error']:
+            print(f"GAGAL  {result['path']}: {result['error']}", file=sys.stderr)
+            continue
+        for sheet_name in result['failed_sheets']:
+            print(f"PERINGATAN  {result['path']}: sheet '{sheet_name}' gagal dibaca", file=sys.stderr)
+        print(f"OK     {result['path']} ({result['rows']} kejadian, {result['seconds']} s) -> {', '.join(result['outputs'])}")
+
+    if args.combine:
+        ok_paths = [result['path'] for result in results if not result['error']]
+        outputs = build_combined(ok_paths, options)
+        if outputs:
+            print(f"OK     gabungan -> {', '.join(outputs)}")
+
+    return 1 if any(result['error'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import functools
+import re
+
+import pandas as pd
+
+# Registry skema kolom LKM: field internal -> pola header (regex, batas kata) + prioritas.
+# Satu header bisa cocok ke beberapa field; yang prioritasnya paling tinggi menang
+# ("Total Technical Downtime" -> TechDowntime, bukan Downtime). Seri di prioritas tertinggi dilaporkan
+# sebagai ambigu, field yang diklaim beberapa kolom sebagai duplikat (kolom terakhir yang dipakai).
+# Hasil resolve di-cache per signature header, jadi template yang sama tidak dicocokkan ulang.
+
+# (field, prioritas, pola). Pola dicocokkan ke header yang sudah dibersihkan (clean_header)
+SCHEMA = [
+    ('Machine', 10, [r'\bmachine name\b', r'\bkode mesin\b']),
+    ('Downtime', 10, [r'(?=.*\btotal\b).*\bdowntime\b']),
+    ('Date', 10, [r'\bstart date\b']),
+    ('Time', 10, [r'\bstart downtime\b']),
+    ('Category', 10, [r'\blevel 2\b']),
+    ('Cause', 10, [r'\blevel 3\b']),
+    ('Action', 10, [r'\btindakan\b']),
+    ('Regu', 10, [r'\bregu\b']),
+    ('Type', 10, [r'\bmachine type\b']),
+    ('Brand', 10, [r'\bbrand\b']),
+    ('StopDate', 10, [r'\bstop date\b']),
+    ('StartRepair', 10, [r'\bstart repair\b']),
+    ('StopRepair', 10, [r'\bstop repair\b']),
+    ('StartProduction', 10, [r'\bstart production\b']),
+    ('ResponTime', 10, [r'\brespon(?:se)? time\b']),
+    ('TechDowntime', 20, [r'\btechnical downtime\b']),
+    ('PIC', 10, [r'\bpic\b']),
+]
+# Field wajib: baris header harus punya keduanya (lihat score_header_row)
+REQUIRED_FIELDS = ['Machine', 'Downtime']
+SIGNATURE_CACHE_SIZE = 256
+
+FIELDS = [field for field, _, _ in SCHEMA]
+_PRIORITY = pd.Series({field: priority for field, priority, _ in SCHEMA})
+_MATCHERS = [(field, re.compile('|'.join(f'(?:{p})' for p in patterns))) for field, _, patterns in SCHEMA]
+
+
+def clean_header(col):
+    return str(col).lower().replace('\n', ' ').replace('\r', '').replace('  ', ' ').strip()
+
+
+def match_matrix(cleaned):
+    # Header bersih -> tabel boolean kolom x field (satu operasi str.contains per field untuk semua kolom)
+    index = pd.Index(cleaned, dtype=object)
+    return pd.DataFrame({field: index.str.contains(regex) for field, regex in _MATCHERS}, index=range(len(index)))
+
+
+@functools.lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _resolve(signature):
+    matches = match_matrix(signature)
+    scores = matches * _PRIORITY[matches.columns]
+    best = scores.max(axis=1)
+    winners = matches & scores.eq(best, axis=0) & (best > 0).to_numpy()[:, None]
+
+    claims, ambiguous = {}, []
+    for pos, row in winners.iterrows():
+        fields = list(row.index[row.to_numpy()])
+        if not fields:
+            continue
+        if len(fields) > 1:
+            ambiguous.append((pos, tuple(fields)))
+        claims.setdefault(fields[0], []).append(pos) # Seri -> urutan di SCHEMA
+    # Field dobel -> kolom terakhir (sama seperti versi if/elif)
+    col_map = tuple((field, positions[-1]) for field, positions in claims.items())
+    duplicates = tuple((field, tuple(positions)) for field, positions in claims.items() if len(positions) > 1)
+    unmapped = tuple(pos for pos in range(len(signature)) if not matches.iloc[pos].any())
+    return col_map, unmapped, tuple(ambiguous), duplicates
+
+
+def resolve_columns(columns):
+    # Return dict: col_map {field: kolom asli}, unmapped [kolom], ambiguous {kolom: [field]},
+    # duplicates {field: [kolom]}. Kolom kosong ("Unnamed: i" dari header_names) tidak dilaporkan.
+    columns = list(columns)
+    col_map, unmapped, ambiguous, duplicates = _resolve(tuple(clean_header(c) for c in columns))
+    return {
+        'col_map': {field: columns[pos] for field, pos in col_map},
+        'unmapped': [columns[pos] for pos in unmapped if not str(columns[pos]).startswith('Unnamed: ')],
+        'ambiguous': {columns[pos]: list(fields) for pos, fields in ambiguous},
+        'duplicates': {field: [columns[pos] for pos in positions] for field, positions in duplicates},
+    }
+
+
+def has_required_fields(cleaned):
+    # Dipakai saat scan kandidat baris header (juga baris data). Saring dulu dengan pola field wajib (murah),
+    # lalu field wajib harus menang setelah aturan prioritas resolve ("Total Technical Downtime" saja
+    # bukan Downtime). Resolve tanpa cache supaya kandidat baris tidak mengisi cache signature.
+    index = pd.Index(cleaned, dtype=object)
+    if not all(index.str.contains(regex).any() for field, regex in _MATCHERS if field in REQUIRED_FIELDS):
+        return False
+    col_map, _, _, _ = _resolve.__wrapped__(tuple(cleaned))
+    return set(REQUIRED_FIELDS) <= {field for field, _ in col_map}
+
+
+def signature_cache_info():
+    return _resolve.cache_info()._asdict()
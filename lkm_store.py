@@ -0,0 +1,170 @@
+import datetime
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from lkm_cache import CACHE_DIR
+from lkm_loader import to_canonical
+
+# Histori multi-workbook di disk: Parquet terpartisi per Area & bulan Date_Raw
+#   <STORE_DIR>/area=Injection/month=2024-01/data.parquet
+# Ingest ulang workbook yang sama (atau file LKM kumulatif yang isinya tumpang tindih) tidak
+# menggandakan baris: tiap baris punya _row_key = hash isi baris + urutan kemunculan isi yang sama.
+# Query hanya membaca partisi yang masuk rentang tanggal / area yang diminta.
+
+STORE_DIR = os.environ.get("LKM_STORE_DIR", os.path.join(CACHE_DIR, "store"))
+PARTITION_FILE = "data.parquet"
+UNKNOWN_MONTH = "none"
+
+
+def _manifest_path(store_dir):
+    return os.path.join(store_dir, "manifest.json")
+
+
+def read_manifest(store_dir=None):
+    store_dir = store_dir or STORE_DIR
+    try:
+        with open(_manifest_path(store_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'version': 0, 'sources': {}}
+
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_manifest(manifest, store_dir):
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+    _atomic_write(_manifest_path(store_dir), write)
+
+
+def _partition_dir(store_dir, area, month):
+    return os.path.join(store_dir, f"area={area}", f"month={month}")
+
+
+def row_keys(df):
+    # Hash isi baris (tanpa kolom turunan) + urutan kemunculan, supaya 2 kejadian identik tetap 2 baris
+    row_hash = pd.util.hash_pandas_object(df, index=False)
+    occurrence = row_hash.groupby(row_hash).cumcount()
+    return pd.util.hash_pandas_object(pd.DataFrame({'h': row_hash, 'n': occurrence}), index=False).to_numpy()
+
+
+def _months(dates):
+    return dates.dt.strftime("%Y-%m").fillna(UNKNOWN_MONTH)
+
+
+def ingest(df, source_key=None, source_name=None, store_dir=None):
+    # Tambahkan frame kanonik ke histori. Return jumlah baris baru & partisi yang ditulis.
+    store_dir = store_dir or STORE_DIR
+    manifest = read_manifest(store_dir)
+    if source_key and source_key in manifest['sources']:
+        return {'rows_added': 0, 'partitions': [], 'skipped': True}
+
+    data = df.drop(columns=['Level 3 Short'], errors='ignore').reset_index(drop=True)
+    data['_row_key'] = row_keys(data)
+
+    rows_added, partitions = 0, []
+    for (area, month), part in data.groupby([data['Area'].astype(str), _months(data['Date_Raw'])], observed=True):
+        path = os.path.join(_partition_dir(store_dir, area, month), PARTITION_FILE)
+        new_rows = _as_plain(part.astype({'Area': str}))
+        if os.path.exists(path):
+            existing = pd.read_parquet(path)
+            new_rows = new_rows[~new_rows['_row_key'].isin(existing['_row_key'])]
+            if new_rows.empty:
+                continue
+            merged = pd.concat([existing, new_rows], ignore_index=True)
+        else:
+            merged = new_rows
+        _atomic_write(path, lambda tmp_path: merged.to_parquet(tmp_path, index=False))
+        rows_added += len(new_rows)
+        partitions.append(f"{area}/{month}")
+
+    manifest['version'] += 1
+    if source_key:
+        manifest['sources'][source_key] = {
+            'name': source_name,
+            'rows': len(data),
+            'rows_added': rows_added,
+            'ingested_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+    _write_manifest(manifest, store_dir)
+    return {'rows_added': rows_added, 'partitions': partitions, 'skipped': False}
+
+
+def _as_plain(df):
+    # Category per partisi beda isi -> simpan sebagai teks biasa, category dibangun ulang saat query
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def list_partitions(store_dir=None):
+    # Return [(area, month), ...] yang ada di disk
+    store_dir = store_dir or STORE_DIR
+    partitions = []
+    if not os.path.isdir(store_dir):
+        return partitions
+    for area_dir in sorted(os.listdir(store_dir)):
+        if not area_dir.startswith("area="):
+            continue
+        for month_dir in sorted(os.listdir(os.path.join(store_dir, area_dir))):
+            if month_dir.startswith("month=") and os.path.exists(os.path.join(store_dir, area_dir, month_dir, PARTITION_FILE)):
+                partitions.append((area_dir[len("area="):], month_dir[len("month="):]))
+    return partitions
+
+
+def date_range(store_dir=None):
+    # Rentang bulan yang tersimpan: (tanggal awal bulan pertama, tanggal akhir bulan terakhir) atau (None, None)
+    months = sorted({month for _, month in list_partitions(store_dir) if month != UNKNOWN_MONTH})
+    if not months:
+        return None, None
+    start = pd.Timestamp(months[0] + "-01")
+    end = pd.Timestamp(months[-1] + "-01") + pd.offsets.MonthEnd(0)
+    return start.date(), end.date()
+
+
+def select_partitions(partitions, start_date=None, end_date=None, areas=None):
+    # Partition pruning: cukup dari nama folder, tanpa membuka file
+    first = pd.Timestamp(start_date).strftime("%Y-%m") if start_date is not None else None
+    last = pd.Timestamp(end_date).strftime("%Y-%m") if end_date is not None else None
+    selected = []
+    for area, month in partitions:
+        if areas is not None and area not in areas:
+            continue
+        if month == UNKNOWN_MONTH:
+            # Baris tanpa tanggal hanya ikut kalau tidak ada filter tanggal
+            if first is None and last is None:
+                selected.append((area, month))
+            continue
+        if (first is None or month >= first) and (last is None or month <= last):
+            selected.append((area, month))
+    return selected
+
+
+def query(start_date=None, end_date=None, areas=None, store_dir=None):
+    # Frame kanonik dari partisi yang dibutuhkan saja; batas tanggal inklusif
+    store_dir = store_dir or STORE_DIR
+    frames = []
+    for area, month in select_partitions(list_partitions(store_dir), start_date, end_date, areas):
+        part = pd.read_parquet(os.path.join(_partition_dir(store_dir, area, month), PARTITION_FILE))
+        if start_date is not None:
+            part = part[part['Date_Raw'] >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            part = part[part['Date_Raw'] < pd.Timestamp(end_date) + pd.Timedelta(days=1)]
+        frames.append(part)
+    if not frames:
+        return pd.DataFrame()
+    df = to_canonical(pd.concat(frames, ignore_index=True).drop(columns='_row_key'))
+    df.attrs['header_rows'] = {}
+    return df
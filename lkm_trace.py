@@ -0,0 +1,129 @@
+import contextlib
+import contextvars
+import cProfile
+import datetime
+import io
+import json
+import logging
+import os
+import pstats
+import time
+
+from lkm_cache import CACHE_DIR
+
+# Instrumentasi load per tahap & per sheet: waktu, baris, bytes, percobaan header, error.
+# Record hanya dikumpulkan di dalam collect() -> tanpa collect() stage() tidak mencatat apa-apa.
+# ContextVar: tiap sesi Streamlit (thread) & tiap worker process punya daftar record sendiri.
+# watch(callback): callback dipanggil tiap awal stage / checkpoint (progress & pembatalan job background).
+
+TRACE_DIR = os.environ.get("LKM_TRACE_DIR", os.path.join(CACHE_DIR, "traces"))
+PROFILE_TOP = 30
+
+logger = logging.getLogger("lkm.trace")
+
+_records = contextvars.ContextVar("lkm_trace_records", default=None)
+_watcher = contextvars.ContextVar("lkm_trace_watcher", default=None)
+
+
+@contextlib.contextmanager
+def collect():
+    records = []
+    token = _records.set(records)
+    try:
+        yield records
+    finally:
+        _records.reset(token)
+
+
+@contextlib.contextmanager
+def watch(callback):
+    # callback(record) dipanggil saat stage mulai (record tanpa 'seconds'), record dari worker process
+    # (sudah selesai) & checkpoint() (record None). Exception dari callback membatalkan proses.
+    token = _watcher.set(callback)
+    try:
+        yield
+    finally:
+        _watcher.reset(token)
+
+
+def checkpoint(record=None):
+    callback = _watcher.get()
+    if callback is not None:
+        callback(record)
+
+
+@contextlib.contextmanager
+def stage(name, sheet=None, **fields):
+    # Field tambahan (rows, bytes, attempts, ...) boleh diisi di dalam blok lewat record yang di-yield
+    records = _records.get()
+    record = {'stage': name, 'sheet': sheet, **fields}
+    checkpoint(record)
+    if records is None:
+        yield record
+        return
+    t0 = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        # Error tetap di-raise ke pemanggil, tapi tercatat (termasuk yang nanti ditelan except di parser)
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['seconds'] = round(time.perf_counter() - t0, 6)
+        records.append(record)
+
+
+def extend(records):
+    # Gabungkan record dari worker process ke trace yang sedang aktif
+    current = _records.get()
+    if current is not None:
+        current.extend(records)
+    for record in records:
+        checkpoint(record)
+
+
+def log_trace(records, label="load"):
+    for record in records:
+        fields = " ".join(f"{k}={v}" for k, v in record.items() if k not in ('stage', 'sheet', 'seconds'))
+        logger.info("%s %s%s %.3fs %s", label, record['stage'],
+                    f"[{record['sheet']}]" if record['sheet'] else "", record['seconds'], fields)
+
+
+def save_trace(records, label="load", profile=None, directory=None, **meta):
+    # JSON sink: satu file per load (meta: mis. total_seconds, source), return path file
+    directory = directory or TRACE_DIR
+    os.makedirs(directory, exist_ok=True)
+    now = datetime.datetime.now()
+    path = os.path.join(directory, f"{label}-{now:%Y%m%d-%H%M%S-%f}.json")
+    with open(path, "w") as f:
+        json.dump({
+            'label': label,
+            'timestamp': now.isoformat(timespec='seconds'),
+            **meta,
+            'profile': (profile or {}).get('path'),
+            'records': records,
+        }, f, indent=2, default=str)
+    return path
+
+
+@contextlib.contextmanager
+def profiled(enabled=False, label="load", directory=None):
+    # Switch cProfile di sekitar satu load; file .prof disimpan (buka dengan snakeviz / pstats)
+    result = {}
+    if not enabled:
+        yield result
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        directory = directory or TRACE_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{label}-{datetime.datetime.now():%Y%m%d-%H%M%S-%f}.prof")
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        result['path'] = path
+        result['top'] = out.getvalue()
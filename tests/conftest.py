@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Modul lkm_* ada di root repo (bukan package) -> tambahkan root ke sys.path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
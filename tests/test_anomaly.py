@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lkm_analytics import build_cube
+from lkm_anomaly import ANOMALY_COLUMNS, update_anomalies
+
+# Update incremental (data bertambah per refresh) harus sama dengan hitung ulang dari awal
+
+
+def _events(days=200, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01')
+    rows = []
+    for day in range(days):
+        for machine_type in ['Type A', 'Type B'] + (['Type C'] if day >= 90 else []):
+            minutes = rng.integers(20, 80) * (12 if rng.random() < 0.03 else 1)
+            rows.append((start + pd.Timedelta(days=day, hours=int(rng.integers(0, 24))), machine_type, float(minutes)))
+    df = pd.DataFrame(rows, columns=['Date_Raw', 'Machine Type', 'Total Downtime (Menit)'])
+    return df.assign(Area='Injection', Regu='A')
+
+
+def _sorted(anomalies):
+    return anomalies.sort_values(['Periode', 'Tanggal', 'Machine Type']).reset_index(drop=True)
+
+
+def _assert_same(incremental, full):
+    assert incremental['last_day'] == full['last_day']
+    assert len(full['anomalies']) > 0
+    pd.testing.assert_frame_equal(_sorted(incremental['anomalies']), _sorted(full['anomalies']), check_dtype=False)
+    for period, full_state in full['periods'].items():
+        inc_state = incremental['periods'][period]
+        assert inc_state['through'] == full_state['through']
+        assert inc_state['columns'].equals(full_state['columns'])
+        for k in ('mean', 'var', 'count'):
+            np.testing.assert_allclose(inc_state[k], full_state[k])
+
+
+@pytest.mark.parametrize('cutoffs', [
+    [200],
+    [60, 200],
+    [45, 46, 89, 120, 121, 200], # termasuk hari pertama Type C & potongan di tengah minggu
+])
+def test_incremental_matches_full_recompute(cutoffs):
+    df = _events()
+    start = df['Date_Raw'].min().normalize()
+    state = None
+    for n, cutoff in enumerate(cutoffs):
+        part = df[df['Date_Raw'] < start + pd.Timedelta(days=cutoff)]
+        state = update_anomalies(build_cube(part), state, key=n)
+    _assert_same(state, update_anomalies(build_cube(df)))
+
+
+def test_update_after_empty_first_state():
+    df = _events()
+    empty = update_anomalies(build_cube(df.iloc[:0]), key='empty')
+    assert empty['last_day'] is None
+    assert list(empty['anomalies'].columns) == ANOMALY_COLUMNS
+    _assert_same(update_anomalies(build_cube(df), empty, key='full'), update_anomalies(build_cube(df)))
+
+
+def test_same_key_is_not_recomputed():
+    cube = build_cube(_events(60))
+    state = update_anomalies(cube, key='a')
+    assert update_anomalies(cube, state, key='a') is state
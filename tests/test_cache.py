@@ -0,0 +1,32 @@
+import logging
+
+import pandas as pd
+import pytest
+
+import lkm_cache
+
+# Cache Parquet: gagal tulis tidak menggagalkan load, tapi harus kelihatan di log & trace
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(lkm_cache, 'CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_roundtrip_with_state():
+    df = pd.DataFrame({'Tindakan': ['101', 'Ganti part']})
+    assert lkm_cache.put_cached('abc', df, {'sheets': {}})
+    cached, state = lkm_cache.get_cached('abc')
+    assert cached.equals(df) and state == {'sheets': {}}
+
+
+def test_skipped_write_is_logged_and_recorded(cache_dir, caplog):
+    df = pd.DataFrame({'Tindakan': pd.Series([101, 'Ganti part'], dtype=object)})
+    record = {}
+    with caplog.at_level(logging.WARNING, logger='lkm.cache'):
+        assert not lkm_cache.put_cached('abc', df, record=record)
+    assert record['error'].startswith('Arrow') # ArrowInvalid / ArrowTypeError tergantung versi pyarrow
+    assert 'cache write skipped' in caplog.text
+    assert lkm_cache.get_cached('abc') == (None, None)
+    assert list(cache_dir.iterdir()) == []
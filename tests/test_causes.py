@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from lkm_causes import canonical_causes, normalize_causes
+
+# Penyebab Level 3: typo digabung ke ejaan yang benar, penyebab berbeda (beda part / angka) tetap terpisah
+
+
+def _canonical(values):
+    return canonical_causes(pd.Series(values, dtype='category')).astype(object).tolist()
+
+
+@pytest.mark.parametrize('a, b', [
+    ('Bolt putus', 'Belt putus'),
+    ('Valve rusak', 'Value rusak'),
+    ('Nozzle 1 bocor', 'Nozzle 2 bocor'),
+    ('Seal bocor', 'Seal bocor lagi'),
+    ('Motor panas', 'Pompa panas'),
+])
+def test_different_causes_stay_apart(a, b):
+    assert _canonical([a, b]) == [a, b]
+
+
+@pytest.mark.parametrize('values, expected', [
+    # Jumlah sama -> ejaan baku / lebih panjang menang, bukan urutan abjad
+    (['Sensor error', 'Sensor eror'], 'Sensor error'),
+    (['Sensor eror', 'Sensor error'], 'Sensor error'),
+    (['Pompa mace', 'Pompa macet'], 'Pompa macet'),
+    (['Ganti bearnig', 'Ganti bearing'], 'Ganti bearing'),
+    # Ejaan yang paling sering dipakai tetap menang
+    (['Sensor eror', 'Sensor eror', 'Sensor error'], 'Sensor eror'),
+    (['GANTI  BEARING.', 'ganti bearing', 'Ganti Bearing', 'Ganti Bearing'], 'Ganti Bearing'),
+])
+def test_typos_merge_to_canonical_label(values, expected):
+    assert set(_canonical(values)) == {expected}
+
+
+@pytest.mark.parametrize('values', [
+    ['Conveyor nyangkut', 'Conveyor nyangkit'],
+    ['Conveyor nyangkit', 'Conveyor nyangkut'],
+])
+def test_tie_without_dictionary_word_uses_first_seen(values):
+    assert set(_canonical(values)) == {values[0]}
+
+
+def test_missing_values_stay_missing():
+    result = canonical_causes(pd.Series(['Seal bocor', None, 'Seal  bocor'], dtype='category'))
+    assert result.isna().tolist() == [False, True, False]
+    assert result.dropna().nunique() == 1
+
+
+def test_normalize_causes():
+    assert normalize_causes(['  Ganti  Béaring. ', 'SEAL_bocor']).tolist() == ['ganti bearing', 'seal bocor']
@@ -0,0 +1,51 @@
+import json
+
+import pandas as pd
+
+from lkm_analytics import OTHERS_FLAG, top_n_columns, top_n_with_others
+from lkm_charts import is_others_point, level3_figure, trend_figure
+
+# "Lainnya" juga penyebab Level 3 asli: batang gabungan top-N tidak boleh tertukar dengannya
+
+
+def _level3(n):
+    causes = ['Lainnya'] + [f"Penyebab {i:02d}" for i in range(n - 1)]
+    return pd.DataFrame({'Level 3': causes, 'Jumlah Kejadian': range(n, 0, -1)})
+
+
+def test_top_n_keeps_real_lainnya_apart_from_bucket():
+    df = top_n_with_others(_level3(40), 'Level 3', 'Jumlah Kejadian', 25)
+    assert len(df) == 26
+    assert df['Level 3'].is_unique
+    assert df[OTHERS_FLAG].tolist() == [False] * 25 + [True]
+    assert df.loc[df['Level 3'] == 'Lainnya', 'Jumlah Kejadian'].item() == 40
+    assert df['Jumlah Kejadian'].sum() == _level3(40)['Jumlah Kejadian'].sum()
+
+
+def test_top_n_columns_does_not_overwrite_real_column():
+    pivot = pd.DataFrame([[5, 1, 1, 1]], columns=['Lainnya', 'A', 'B', 'C'])
+    out = top_n_columns(pivot, 2)
+    assert out['Lainnya'].item() == 5
+    assert out.sum(axis=1).item() == 8
+
+
+def test_level3_click_flag_in_customdata():
+    fig = level3_figure(_level3(40), selected_level3='Lainnya')
+    bar = fig.data[0]
+    flags = {y: bool(c[0]) for y, c in zip(bar.y, bar.customdata)}
+    assert flags['Lainnya'] is False
+    assert sum(flags.values()) == 1
+    # Titik hasil klik st.plotly_chart membawa customdata yang sama
+    assert not is_others_point({'y': 'Lainnya', 'customdata': [False]})
+    assert is_others_point({'y': 'Lainnya (15 lainnya)', 'customdata': [True]})
+    assert not is_others_point({'y': 'Type 1'})
+
+
+def test_trend_webgl_only_without_downsampling():
+    days = pd.date_range('2021-01-01', periods=1500, freq='D')
+    daily = pd.DataFrame({'Tanggal_Plot': days.date, 'Total Downtime (Menit)': 1.0})
+    small = trend_figure(daily)
+    full = trend_figure(daily, downsample=False)
+    assert small.data[0].type == 'scatter' and len(small.data[0].x) <= 60
+    assert full.data[0].type == 'scattergl'
+    assert len(json.dumps(small.to_plotly_json(), default=str)) < len(json.dumps(full.to_plotly_json(), default=str)) / 2
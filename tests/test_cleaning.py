@@ -0,0 +1,68 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lkm_loader import (
+    clean_downtime_series, clean_downtime_value, to_datetime_series, to_label_category, to_time_of_day_series,
+)
+
+# Versi vektor harus sama persis dengan fungsi skalar (Series.apply) untuk semua jenis sel di sheet LKM
+MIXED = [
+    12, 7.5, 0, -3, np.nan, None,
+    datetime.time(1, 30), datetime.time(0, 45, 30), datetime.time(2, 5, 59, 999999),
+    pd.Timedelta(minutes=90), pd.Timedelta(seconds=45),
+    '', '-', ' 7 ', '12.5', '1_000', 'nan', 'abc',
+    True, False, np.int64(4), np.float64(2.5), np.float32(1.5),
+    pd.NaT, pd.Timestamp('2024-03-01 08:15'), datetime.datetime(2024, 3, 2, 22, 40), datetime.date(2024, 3, 3),
+]
+
+
+def _scalar(values, fn):
+    return pd.Series(values, dtype=object).map(fn)
+
+
+@pytest.mark.parametrize('values', [
+    MIXED,
+    [5, 10.5, np.nan],
+    [pd.Timedelta(minutes=5), pd.NaT],
+    [datetime.time(0, 10), '', '-', ' 7 '],
+])
+def test_clean_downtime_series_matches_scalar(values):
+    s = pd.Series(values)
+    expected = _scalar(values, clean_downtime_value).astype(float)
+    result = clean_downtime_series(s).astype(float)
+    np.testing.assert_array_equal(result.to_numpy(), expected.to_numpy())
+
+
+def test_clean_downtime_series_time_ignores_microseconds():
+    result = clean_downtime_series(pd.Series([datetime.time(2, 5, 59, 999999)], dtype=object))
+    assert result.iloc[0] == pytest.approx(125 + 59 / 60)
+
+
+def test_to_label_category_keeps_labels_of_categorical_input():
+    # Refresh incremental menggabungkan potongan df lama (sudah category) dengan baris baru (object)
+    plain = pd.Series(['Regu B', 101, 'Regu A', None, '101', 'Regu B'], dtype=object)
+    first = to_label_category(plain)
+    again = to_label_category(pd.concat([first, pd.Series(['Regu C'], dtype=object)], ignore_index=True))
+    assert first.astype(object).tolist() == ['Regu B', '101', 'Regu A', np.nan, '101', 'Regu B']
+    assert again.astype(object).tolist() == first.astype(object).tolist() + ['Regu C']
+    assert to_label_category(first).astype(object).tolist() == first.astype(object).tolist()
+
+
+def test_to_time_of_day_series():
+    values = [datetime.time(6, 5, 9, 999999), pd.Timestamp('2024-03-01 08:15:30'), datetime.datetime(2024, 3, 2, 22, 40),
+              None, np.nan, '-', 7, True]
+    result = to_time_of_day_series(pd.Series(values, dtype=object))
+    expected = pd.to_timedelta(['06:05:09', '08:15:30', '22:40:00'] + [None] * 5)
+    assert result.dtype == 'timedelta64[ns]'
+    assert result.tolist() == pd.Series(expected).tolist()
+
+
+def test_to_datetime_series():
+    values = [datetime.datetime(2024, 3, 2, 22, 40), datetime.date(2024, 3, 3), '2024-03-04', 'bukan tanggal', 12, None]
+    result = to_datetime_series(pd.Series(values, dtype=object))
+    expected = [pd.Timestamp('2024-03-02 22:40'), pd.Timestamp('2024-03-03'), pd.Timestamp('2024-03-04')]
+    assert result.tolist()[:3] == expected
+    assert result.iloc[3:].isna().all()
@@ -0,0 +1,110 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import lkm_fetch
+from lkm_fetch import fetch_bytes
+
+# Server HTTP lokal pengganti export Google Sheet: isi + ETag bisa diganti, dan beberapa request
+# pertama bisa dibuat gagal (status error) untuk menguji retry.
+
+
+class FakeSheet:
+    def __init__(self):
+        self.body = b"versi-1"
+        self.etag = '"v1"'
+        self.failures = []
+        self.requests = []
+
+
+def _handler(sheet):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            sheet.requests.append({'path': self.path, 'if_none_match': self.headers.get('If-None-Match')})
+            if sheet.failures:
+                self.send_response(sheet.failures.pop(0))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if self.path != '/export':
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if self.headers.get('If-None-Match') == sheet.etag:
+                self.send_response(304)
+                self.send_header('ETag', sheet.etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', sheet.etag)
+            self.send_header('Content-Length', str(len(sheet.body)))
+            self.end_headers()
+            self.wfile.write(sheet.body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def sheet(tmp_path, monkeypatch):
+    monkeypatch.setattr(lkm_fetch, 'FETCH_DIR', str(tmp_path))
+    fake = FakeSheet()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _handler(fake))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_address[1]}/export"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def test_first_fetch_stores_body_and_etag(sheet):
+    data, changed = fetch_bytes(sheet.url)
+    assert (data, changed) == (b"versi-1", True)
+    key, meta_path = lkm_fetch._paths(sheet.url)
+    meta = lkm_fetch._read_meta(meta_path)
+    assert meta['etag'] == '"v1"'
+    assert lkm_fetch._read_body(key, meta) == b"versi-1"
+
+
+def test_not_modified_returns_stored_bytes(sheet):
+    fetch_bytes(sheet.url)
+    sheet.body = b"isi server tidak dipakai saat 304"
+    data, changed = fetch_bytes(sheet.url)
+    assert (data, changed) == (b"versi-1", False)
+    assert sheet.requests[-1]['if_none_match'] == '"v1"'
+
+
+def test_changed_body_replaces_local_copy(sheet, tmp_path):
+    fetch_bytes(sheet.url)
+    sheet.body, sheet.etag = b"versi-2", '"v2"'
+    assert fetch_bytes(sheet.url) == (b"versi-2", True)
+    assert fetch_bytes(sheet.url) == (b"versi-2", False)
+    # Isi versi lama dibuang, hanya satu salinan per URL
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.xlsx')]) == 1
+
+
+def test_missing_local_copy_downloads_again(sheet, tmp_path):
+    fetch_bytes(sheet.url)
+    for name in os.listdir(tmp_path):
+        if name.endswith('.xlsx'):
+            os.remove(tmp_path / name)
+    assert fetch_bytes(sheet.url) == (b"versi-1", False)
+    assert sheet.requests[-1]['if_none_match'] is None
+
+
+def test_not_found_raises(sheet):
+    with pytest.raises(requests.HTTPError):
+        fetch_bytes(sheet.url.replace('/export', '/hilang'))
+
+
+def test_retries_on_service_unavailable(sheet):
+    sheet.failures = [503, 503]
+    assert fetch_bytes(sheet.url) == (b"versi-1", True)
+    assert len(sheet.requests) == 3
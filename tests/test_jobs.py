@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+
+import openpyxl
+import pytest
+
+import lkm_loader
+from downtime_engine import open_dataset, refresh_dataset, traced
+from lkm_jobs import LoadCancelled, submit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_lkm import make_workbook # noqa: E402
+
+# Pembatalan job harus sampai ke pemanggil sebagai LoadCancelled, bukan ditelan handler per sheet
+# di parser (yang akan melaporkan semua sheet "gagal dibaca").
+
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    return make_workbook(str(tmp_path_factory.mktemp('lkm') / 'lkm.xlsx'), rows_per_sheet=50)
+
+
+@pytest.fixture
+def paused_parse(monkeypatch):
+    # detect_header_row pertama berhenti sampai test membatalkan job; stage berikutnya melihat cancel
+    reached, resume = threading.Event(), threading.Event()
+    detect = lkm_loader.detect_header_row
+
+    def paused(*args, **kwargs):
+        reached.set()
+        resume.wait(10)
+        return detect(*args, **kwargs)
+
+    monkeypatch.setattr(lkm_loader, 'detect_header_row', paused)
+    return reached, resume
+
+
+@pytest.mark.parametrize('fn, kwargs', [
+    (open_dataset, {'use_cache': False}),
+    (open_dataset, {'use_cache': False, 'streaming': True}),
+    (refresh_dataset, {'use_cache': False}),
+])
+def test_cancelled_job_raises(workbook, paused_parse, fn, kwargs):
+    reached, resume = paused_parse
+    job = submit('load', traced, fn, workbook, **kwargs, label='load', save=False)
+    assert reached.wait(10)
+    job.cancel()
+    resume.set()
+    assert job.wait(30)
+    assert job.status == 'cancelled'
+    with pytest.raises(LoadCancelled):
+        job.result()
+
+
+def test_finished_job_returns_result(workbook):
+    job = submit('load', traced, open_dataset, workbook, use_cache=False, label='load', save=False)
+    assert job.wait(60)
+    (handle, failed_sheets, state), _ = job.result()
+    assert job.status == 'done'
+    assert handle is not None and failed_sheets == []
+    assert len(state['sheets']) == 4
+
+
+def test_progress_counts_matched_sheets(tmp_path):
+    # Total progress = sheet yang cocok di workbook, bukan len(TARGET_SHEETS)
+    path = make_workbook(str(tmp_path / 'lkm.xlsx'), rows_per_sheet=20)
+    wb = openpyxl.load_workbook(path)
+    wb.remove(wb['LKM Cutting'])
+    wb['LKM Packing'].title = 'Rekap'
+    wb.save(path)
+    job = submit('load', traced, open_dataset, path, use_cache=False, label='load', save=False)
+    assert job.wait(60)
+    progress = job.progress()
+    assert progress['sheets_done'] == 2
+    assert progress['fraction'] == 1.0
+
+
+@pytest.mark.parametrize('cancel', [False, True])
+def test_streaming_workbook_closed(workbook, paused_parse, monkeypatch, cancel):
+    # Workbook openpyxl read-only mode streaming (serial) ditutup setelah selesai maupun dibatalkan
+    closed = []
+    open_streaming = lkm_loader.open_workbook_streaming
+
+    def tracked(source):
+        book = open_streaming(source)
+        close = book.close
+        book.close = lambda: (closed.append(True), close())
+        return book
+
+    monkeypatch.setattr(lkm_loader, 'open_workbook_streaming', tracked)
+    reached, resume = paused_parse
+    job = submit('load', traced, open_dataset, workbook, use_cache=False, streaming=True, label='load', save=False)
+    assert reached.wait(10)
+    if cancel:
+        job.cancel()
+    resume.set()
+    assert job.wait(30)
+    assert job.status == ('cancelled' if cancel else 'done')
+    assert closed == [True]
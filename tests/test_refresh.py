@@ -0,0 +1,88 @@
+import os
+import shutil
+import sys
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import lkm_loader
+from downtime_engine import load_workbook, load_workbook_state, refresh_workbook
+from lkm_trace import collect
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_lkm import HEADER, make_workbook # noqa: E402
+
+# Refresh incremental (fingerprint blok dari load awal) harus sama persis dengan load penuh file yang baru,
+# dan hanya blok yang berubah yang dibersihkan ulang. Blok kecil supaya workbook tes kecil: 120 baris = 3 blok.
+BLOCK_ROWS = 50
+ROWS = 120
+
+
+@pytest.fixture(scope='module', autouse=True)
+def small_blocks():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(lkm_loader, 'BLOCK_ROWS', BLOCK_ROWS)
+        yield
+
+
+@pytest.fixture(scope='module')
+def base(tmp_path_factory, small_blocks):
+    path = make_workbook(str(tmp_path_factory.mktemp('lkm') / 'base.xlsx'), rows_per_sheet=ROWS)
+    df, _, failed, state = load_workbook_state(path, use_cache=False)
+    assert failed == []
+    return path, df, state
+
+
+def _edit(base, tmp_path, change):
+    path = str(tmp_path / 'edited.xlsx')
+    shutil.copy(base[0], path)
+    wb = openpyxl.load_workbook(path)
+    change(wb)
+    wb.save(path)
+    return path
+
+
+def _header_row(ws):
+    return next(row[0].row for row in ws.iter_rows(max_col=1) if row[0].value == 'No')
+
+
+def _refresh(base, path):
+    with collect() as records:
+        df, failed, _ = refresh_workbook(path, base[1], base[2], use_cache=False)
+    assert failed == []
+    expected, _, _ = load_workbook(path, use_cache=False)
+    pd.testing.assert_frame_equal(df, expected)
+    return {r['sheet']: r['reused'] for r in records if r['stage'] == 'refresh_blocks'}
+
+
+def test_appended_rows(base, tmp_path):
+    def change(wb):
+        ws = wb['LKM Injection']
+        first = _header_row(ws) + 1
+        for row in list(ws.iter_rows(min_row=first, max_row=first + 39, values_only=True)):
+            ws.append(row)
+    reused = _refresh(base, _edit(base, tmp_path, change))
+    # 2 blok penuh dipakai ulang; blok terakhir (20 baris lama + 30 baris baru) & blok baru dibersihkan ulang
+    assert reused == {'LKM Injection': 2, 'LKM Filling': 3, 'LKM Cutting': 3, 'LKM Packing': 3}
+
+
+def test_edited_row_in_earlier_block(base, tmp_path):
+    def change(wb):
+        ws = wb['LKM Filling']
+        ws.cell(row=_header_row(ws) + 11, column=HEADER.index('Level 3') + 1).value = 'Pompa macet'
+    reused = _refresh(base, _edit(base, tmp_path, change))
+    assert reused['LKM Filling'] == 2
+    assert sum(reused.values()) == 11
+
+
+@pytest.mark.parametrize('change', [
+    # Baris header bergeser (baris kosong disisipkan di atas tabel)
+    lambda wb: wb['LKM Cutting'].insert_rows(1),
+    # Header berganti nama: isi sel sama (fingerprint sama) tapi pemetaan kolom berubah
+    lambda wb: setattr(wb['LKM Cutting'].cell(row=_header_row(wb['LKM Cutting']), column=HEADER.index('PIC') + 1), 'value', 'Teknisi'),
+], ids=['moved', 'renamed'])
+def test_changed_header_row(base, tmp_path, change):
+    reused = _refresh(base, _edit(base, tmp_path, change))
+    assert reused['LKM Cutting'] == 0
+    assert sum(reused.values()) == 9
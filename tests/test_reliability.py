@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lkm_analytics import build_event_times, reliability_summary
+
+# MTTR / MTBF dari fixture kecil yang dihitung tangan.
+#   M1: e1 08:00-09:00 (perbaikan 08:10-08:40), e2 13:00-15:00 (13:30-14:30), e3 hari-2 09:00-10:00 (09:05-09:35)
+#   M2: e4 22:00 -> produksi hari-2 01:00 (perbaikan 23:30 -> 00:30 lewat tengah malam),
+#       e5 hari-2 11:00, Stop Repair & produksi kosong -> MTTR dari Technical Downtime, selesai = mulai + Total Downtime
+# Jarak per mesin: e2 = 13:00 - 09:00 = 4 jam, e3 = 09:00 - 15:00 = 18 jam, e5 = 11:00 - 01:00 = 10 jam
+
+
+def _td(values):
+    return pd.to_timedelta(pd.Series(values, dtype=object))
+
+
+@pytest.fixture
+def events():
+    day1, day2 = pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-02')
+    return pd.DataFrame({
+        'Date_Raw': [day1, day1, day2, day1, day2],
+        'Stop Date': [day1, day1, day2, day2, pd.NaT],
+        'Jam': _td(['08:00:00', '13:00:00', '09:00:00', '22:00:00', '11:00:00']),
+        'Start Repair': _td(['08:10:00', '13:30:00', '09:05:00', '23:30:00', '11:15:00']),
+        'Stop Repair': _td(['08:40:00', '14:30:00', '09:35:00', '00:30:00', None]),
+        'Start Production': _td(['09:00:00', '15:00:00', '10:00:00', '01:00:00', None]),
+        'Total Downtime (Menit)': np.array([60, 120, 60, 180, 60], dtype='float32'),
+        'Technical Downtime': np.array([30, 60, 30, 60, 45], dtype='float32'),
+        'Respon Time': np.array([10, 30, 5, 90, 15], dtype='float32'),
+        'Nama Mesin': ['M1', 'M1', 'M1', 'M2', 'M2'],
+        'Machine Type': ['T1', 'T1', 'T1', 'T2', 'T2'],
+        'Level 3 Short': ['A', 'B', 'A', 'A', 'B'],
+        'Regu': ['X', 'X', 'Y', 'Y', 'Y'],
+    })
+
+
+def test_event_times(events):
+    times = build_event_times(events)
+    assert times['Lama Perbaikan (Menit)'].tolist()[:4] == [30, 60, 30, 60]
+    assert np.isnan(times['Lama Perbaikan (Menit)'].iloc[4])
+    assert times['Tunggu Perbaikan (Menit)'].tolist() == [10, 30, 5, 90, 15]
+    assert times['Selesai'].iloc[4] == pd.Timestamp('2024-01-02 12:00')
+    np.testing.assert_array_equal(times['Jarak Antar Kerusakan (Jam)'], [np.nan, 4, 18, np.nan, 10])
+
+
+def test_overall_summary(events):
+    summary = reliability_summary(events, build_event_times(events))
+    assert summary['MTTR (Menit)'] == pytest.approx((30 + 60 + 30 + 60 + 45) / 5)
+    assert summary['MTBF (Jam)'] == pytest.approx((4 + 18 + 10) / 3)
+    assert summary['Tunggu Perbaikan (Menit)'] == pytest.approx(30)
+    assert summary['Kejadian'] == 5 and summary['Kejadian/Minggu'] == 5
+
+
+@pytest.mark.parametrize('by, expected', [
+    # Atribut mesin: rata-rata jarak per mesin di grup itu
+    ('Machine Type', {'T1': (4 + 18) / 2, 'T2': 10}),
+    # Level 3 A: M1 e1 -> e3 = 09:00 hari-1 s/d 09:00 hari-2 = 24 jam (e2 penyebab lain tidak dihitung),
+    # M2 hanya sekali; Level 3 B: tiap mesin hanya sekali -> tidak ada MTBF
+    ('Level 3 Short', {'A': 24, 'B': np.nan}),
+    # Regu X: M1 e1 -> e2 = 4 jam; Regu Y: M1 e3 sendiri, M2 e4 -> e5 = 10 jam
+    ('Regu', {'X': 4, 'Y': 10}),
+])
+def test_mtbf_by_group(events, by, expected):
+    table = reliability_summary(events, build_event_times(events), by).set_index(by)
+    mtbf = table['MTBF (Jam)'].to_dict()
+    assert mtbf.keys() == expected.keys()
+    for group, value in expected.items():
+        assert mtbf[group] == pytest.approx(value, nan_ok=True)
+
+
+def test_mttr_by_group(events):
+    table = reliability_summary(events, build_event_times(events), 'Level 3 Short').set_index('Level 3 Short')
+    assert table.loc['A', 'MTTR (Menit)'] == pytest.approx((30 + 30 + 60) / 3)
+    assert table.loc['B', 'MTTR (Menit)'] == pytest.approx((60 + 45) / 2)
+    assert table['Kejadian'].to_dict() == {'A': 3, 'B': 2}
@@ -0,0 +1,28 @@
+import os
+import sys
+
+from lkm_report import main, report_stems
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_lkm import make_workbook # noqa: E402
+
+# Nama file laporan per workbook tidak boleh bentrok (file dengan nama sama di folder berbeda)
+
+
+def test_report_stems():
+    assert report_stems(['data/LKM Jan.xlsx', 'data/LKM Feb.xlsx']) == ['LKM Jan', 'LKM Feb']
+    assert report_stems(['2024/Jan/LKM.xlsx', '2024/Feb/LKM.xlsx', 'lain.xlsx']) == ['Jan_LKM', 'Feb_LKM', 'lain']
+    # Folder induk juga sama / beda huruf besar-kecil saja -> akhiran
+    assert report_stems(['a/x/LKM.xlsx', 'b/x/lkm.xlsx']) == ['x_LKM', 'x_lkm_2']
+    assert report_stems(['a/LKM.xlsx', 'b/LKM.xlsx', 'a_LKM.xlsx']) == ['a_LKM', 'b_LKM', 'a_LKM_2']
+
+
+def test_same_name_in_different_folders(tmp_path):
+    for folder, seed in [('jan', 0), ('feb', 1)]:
+        os.makedirs(tmp_path / folder)
+        make_workbook(str(tmp_path / folder / 'LKM.xlsx'), rows_per_sheet=10, seed=seed)
+    out = tmp_path / 'laporan'
+    status = main([str(tmp_path / 'jan' / 'LKM.xlsx'), str(tmp_path / 'feb' / 'LKM.xlsx'),
+                   '--out', str(out), '--format', 'xlsx', '--workers', '1', '--no-cache'])
+    assert status == 0
+    assert sorted(os.listdir(out)) == ['feb_LKM.xlsx', 'jan_LKM.xlsx']
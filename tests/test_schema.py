@@ -0,0 +1,62 @@
+import pytest
+
+from lkm_schema import REQUIRED_FIELDS, clean_header, has_required_fields, resolve_columns
+
+# Pemetaan header LKM -> field internal lewat registry skema (prioritas, batas kata, laporan ambigu / dobel)
+
+
+@pytest.mark.parametrize('header, field', [
+    ('Start Date', 'Date'),
+    ('Stop Date', 'StopDate'),
+    ('Start Downtime', 'Time'),
+    ('Start Repair', 'StartRepair'),
+    ('Stop Repair', 'StopRepair'),
+    ('Start Production', 'StartProduction'),
+    ('Total\nDowntime', 'Downtime'),
+    ('Total Technical Downtime', 'TechDowntime'),
+    ('Technical Downtime', 'TechDowntime'),
+    ('Respon Time', 'ResponTime'),
+    ('Response Time', 'ResponTime'),
+    ('PIC', 'PIC'),
+    ('Machine Name', 'Machine'),
+    ('Machine Type', 'Type'),
+    ('Level 3', 'Cause'),
+])
+def test_single_header_maps_to_field(header, field):
+    assert resolve_columns(['No', header])['col_map'] == {field: header}
+
+
+def test_start_and_stop_date_do_not_swap():
+    col_map = resolve_columns(['Stop Date', 'Start Date'])['col_map']
+    assert col_map == {'StopDate': 'Stop Date', 'Date': 'Start Date'}
+
+
+def test_total_technical_downtime_is_not_total_downtime():
+    mapping = resolve_columns(['Total Technical Downtime', 'Total Downtime'])
+    assert mapping['col_map'] == {'TechDowntime': 'Total Technical Downtime', 'Downtime': 'Total Downtime'}
+    assert mapping['ambiguous'] == {} and mapping['duplicates'] == {}
+
+
+@pytest.mark.parametrize('header', ['Topic', 'Epic', 'Picture', 'Spicy'])
+def test_pic_only_matches_whole_word(header):
+    mapping = resolve_columns([header, 'PIC'])
+    assert mapping['col_map'] == {'PIC': 'PIC'}
+    assert mapping['unmapped'] == [header]
+
+
+def test_reports_ambiguous_duplicate_and_unmapped():
+    mapping = resolve_columns(['Level 2 / Level 3', 'Regu', 'Regu.1', 'Keterangan', 'Unnamed: 4'])
+    assert mapping['ambiguous'] == {'Level 2 / Level 3': ['Category', 'Cause']}
+    assert mapping['duplicates'] == {'Regu': ['Regu', 'Regu.1']}
+    # Field dobel -> kolom terakhir; kolom kosong "Unnamed: i" tidak dilaporkan
+    assert mapping['col_map']['Regu'] == 'Regu.1'
+    assert mapping['unmapped'] == ['Keterangan']
+
+
+def test_required_fields_for_header_scan():
+    assert REQUIRED_FIELDS == ['Machine', 'Downtime']
+    assert has_required_fields([clean_header(c) for c in ['Machine Name', 'Total\nDowntime']])
+    assert not has_required_fields([clean_header(c) for c in ['Machine Name', 'Technical Downtime']])
+    # Pola Downtime cocok, tapi kolomnya dimenangkan TechDowntime (prioritas lebih tinggi) -> bukan header
+    assert not has_required_fields([clean_header(c) for c in ['Machine Name', 'Total Technical Downtime']])
+    assert has_required_fields([clean_header(c) for c in ['Machine Name', 'Total Technical Downtime', 'Total Downtime']])
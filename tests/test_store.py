@@ -0,0 +1,43 @@
+import os
+import sys
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from lkm_loader import combine_frames, load_sheets
+from lkm_store import ingest, query
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_lkm import make_workbook # noqa: E402
+
+# Histori Parquet: kolom teks yang selnya campuran angka / teks / kosong tetap bisa ditulis & dibaca ulang
+
+
+@pytest.fixture(scope='module')
+def mixed_workbook(tmp_path_factory):
+    path = make_workbook(str(tmp_path_factory.mktemp('lkm') / 'lkm.xlsx'), rows_per_sheet=20)
+    wb = openpyxl.load_workbook(path)
+    ws = wb.worksheets[0]
+    header = next(row for row in ws.iter_rows() if any(cell.value == 'Tindakan' for cell in row))
+    col = next(cell.column for cell in header if cell.value == 'Tindakan')
+    for offset, value in enumerate([101, 2.5, None, 'Ganti seal']):
+        ws.cell(row=header[0].row + 1 + offset, column=col).value = value
+    wb.save(path)
+    return path
+
+
+def test_ingest_mixed_type_text_column(mixed_workbook, tmp_path):
+    frames, header_rows, failed = load_sheets(mixed_workbook)
+    df = combine_frames(frames, header_rows)
+    assert failed == []
+    assert df['Tindakan'].iloc[:2].tolist() == ['101', '2.5']
+    assert pd.isna(df['Tindakan'].iloc[2])
+
+    result = ingest(df, 'mixed', 'lkm.xlsx', str(tmp_path))
+    assert result['rows_added'] == len(df)
+
+    stored = query(store_dir=str(tmp_path))
+    assert len(stored) == len(df)
+    assert sorted(stored['Tindakan'].dropna().unique()) == ['101', '2.5', 'Ganti part', 'Ganti seal']
+    assert stored['Tindakan'].isna().sum() == 1